@@ -152,4 +152,7 @@ def signup_view(request):
 
 def ulogout(request): 
     logout(request)
-    return redirect('login')     
\ No newline at end of file
+    response = redirect('login')
+    # A shared school laptop must not keep the last student's offline paper or answer queue.
+    response['Clear-Site-Data'] = '"cache", "storage"'
+    return response     
\ No newline at end of file
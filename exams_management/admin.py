@@ -1,12 +1,66 @@
-from django.contrib import admin
-from .models import Exam, Question, ExamResult, QuestionOption
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from django.forms.models import BaseInlineFormSet
+from . import scoring, sitting
+from .paper import forget_paper
+from .sampling import bump_pools_serving
+from .models import Exam, ExamBlueprintRule, Question, ExamResult, QuestionOption
 
 
-admin.site.register(Question)
+class QuestionAdmin(admin.ModelAdmin):
+    # Exams holding an edited or deleted question must rebuild their pool and paper.
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_pools_serving([obj.id])
+
+    def delete_model(self, request, obj):
+        bump_pools_serving([obj.id])
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        bump_pools_serving(queryset.values_list('id', flat=True))
+        super().delete_queryset(request, queryset)
+
+admin.site.register(Question, QuestionAdmin)
+
+
+class BlueprintRuleFormSet(BaseInlineFormSet):
+    def clean(self):
+        super().clean()
+        limit = self.instance.student_question_limit
+        total = sum(form.cleaned_data.get('count') or 0 for form in self.forms
+                    if form.cleaned_data and not form.cleaned_data.get('DELETE'))
+        if limit and total > limit:
+            # Scores are out of student_question_limit, so a blueprint may not hand out more.
+            raise ValidationError(f"The blueprint asks for {total} questions but students answer {limit}.")
+
+
+class ExamBlueprintRuleInline(admin.TabularInline):
+    model = ExamBlueprintRule
+    formset = BlueprintRuleFormSet
+    extra = 0
 
 
 class ExamAdmin(admin.ModelAdmin):
-    actions = ['delete_selected']
+    actions = ['delete_selected', 'rescore_attempts', 'prepare_sittings']
+    inlines = [ExamBlueprintRuleInline]
+
+    def rescore_attempts(self, request, queryset):
+        rescored = sum(scoring.rescore_exam(exam.id) for exam in queryset)
+        self.message_user(request, f"Re-scored {rescored} submitted attempts.")
+
+    rescore_attempts.short_description = "Re-score submitted attempts with the current answer key"
+
+    def prepare_sittings(self, request, queryset):
+        for exam in queryset:
+            try:
+                prepared = sitting.prepare_sitting(exam)
+            except sitting.SittingError as e:
+                self.message_user(request, f"{exam}: {e}", level=messages.ERROR)
+            else:
+                self.message_user(request, f"{exam}: prepared {prepared} attempts.")
+
+    prepare_sittings.short_description = "Prepare attempts for every student of the grade"
 
     def delete_selected(self, request, queryset):
         # Custom delete logic to handle related objects
@@ -21,5 +75,27 @@ class ExamAdmin(admin.ModelAdmin):
 
 admin.site.register(Exam, ExamAdmin)
 
-admin.site.register(QuestionOption)
+class QuestionOptionAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        for exam_id in obj.question.exam_set.values_list('id', flat=True):
+            forget_paper(exam_id)
+        if change and 'is_correct' in form.changed_data and obj.question_id:
+            rescored = scoring.rescore_question(obj.question_id)
+            self.message_user(request, f"Answer key changed; re-scored {rescored} submitted attempts.")
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self.forget_papers([obj.question_id])
+
+    def delete_queryset(self, request, queryset):
+        question_ids = list(queryset.values_list('question_id', flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        self.forget_papers(question_ids)
+
+    def forget_papers(self, question_ids):
+        for exam_id in Exam.objects.filter(questions__in=question_ids).values_list('id', flat=True).distinct():
+            forget_paper(exam_id)
+
+admin.site.register(QuestionOption, QuestionOptionAdmin)
 admin.site.register(ExamResult)
\ No newline at end of file
@@ -0,0 +1,67 @@
+# exams_management/answer_keys.py
+import threading
+from collections import OrderedDict
+
+MAX_QUESTIONS = 20000
+
+_keys = OrderedDict()
+_lock = threading.Lock()
+
+
+def prime(keys):
+    """
+    Store ``{question_id: (option ids, correct option ids)}``, e.g. from a
+    paper snapshot that has just read the options anyway.
+    """
+    with _lock:
+        for question_id, key in keys.items():
+            _keys[question_id] = key
+            _keys.move_to_end(question_id)
+        while len(_keys) > MAX_QUESTIONS:
+            _keys.popitem(last=False)
+
+
+def load_keys(question_ids):
+    """Read the keys for ``question_ids`` in one query over three narrow columns."""
+    from .models import QuestionOption
+    options = {question_id: ([], []) for question_id in question_ids}
+    for question_id, option_id, is_correct in (QuestionOption.objects.filter(question_id__in=question_ids)
+                                               .values_list('question_id', 'id', 'is_correct')):
+        valid, correct = options[question_id]
+        valid.append(option_id)
+        if is_correct:
+            correct.append(option_id)
+    return {question_id: (frozenset(valid), frozenset(correct)) for question_id, (valid, correct) in options.items()}
+
+
+def keys_for(question_ids):
+    """
+    ``{question_id: (option ids, correct option ids)}`` for ``question_ids``.
+    Questions already in the cache cost nothing; the rest are read together.
+    """
+    found, missing = {}, []
+    with _lock:
+        for question_id in question_ids:
+            key = _keys.get(question_id)
+            if key is None:
+                missing.append(question_id)
+            else:
+                _keys.move_to_end(question_id)
+                found[question_id] = key
+    if missing:
+        loaded = load_keys(missing)
+        prime(loaded)
+        found.update(loaded)
+    return found
+
+
+def forget(question_ids):
+    """Drop cached keys after their options were edited."""
+    with _lock:
+        for question_id in question_ids:
+            _keys.pop(question_id, None)
+
+
+def clear():
+    with _lock:
+        _keys.clear()
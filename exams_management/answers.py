@@ -0,0 +1,110 @@
+# exams_management/answers.py
+from django.db import transaction
+from django.utils import timezone
+from . import answer_keys
+
+
+class AnswerError(ValueError):
+    """A batch names a question outside the attempt or an option of another question."""
+
+
+def clean_answers(attempt, answers):
+    """
+    Validate ``{question_id: option_id}`` against the attempt and return it
+    with integer keys. Questions are checked against the attempt's own list
+    and options against the cached answer keys, so this runs no queries
+    once the keys are warm.
+    """
+    try:
+        answers = {int(question_id): int(option_id) for question_id, option_id in answers.items()}
+    except (TypeError, ValueError):
+        raise AnswerError("Invalid question submitted.")
+    if not answers:
+        return answers
+
+    served = set(attempt.question_ids)
+    if any(question_id not in served for question_id in answers):
+        raise AnswerError("Invalid question submitted.")
+
+    keys = answer_keys.keys_for(answers)
+    if any(option_id not in keys[question_id][0] for question_id, option_id in answers.items()):
+        raise AnswerError("Invalid option for question.")
+    return answers
+
+
+def write_answers(rows):
+    """Upsert ``{(attempt_id, question_id): option_id}`` in a single statement."""
+    from .models import ExamAnswer
+    ExamAnswer.objects.bulk_create(
+        [ExamAnswer(attempt_id=attempt_id, question_id=question_id, selected_option_id=option_id)
+         for (attempt_id, question_id), option_id in rows.items()],
+        update_conflicts=True,
+        unique_fields=['attempt', 'question'],
+        update_fields=['selected_option'],
+    )
+
+
+def apply_answers(attempt, answers, seq=None, deferred=False):
+    """
+    Apply one autosave batch. ``answers`` holds only what changed since the
+    client's last acknowledged batch, and ``seq`` increases with every batch
+    the client sends. A batch whose ``seq`` is not newer than the last one
+    applied is a retry or arrived late, and is dropped without touching the
+    answers.
+
+    With ``deferred`` the batch goes to the write-behind journal when the
+    background flusher is running, and is acknowledged before it reaches
+    ExamAnswer.
+
+    Returns ``(applied, seq)`` where ``seq`` is the newest sequence applied.
+    """
+    from .models import ExamResult
+    from .journal import journal
+    from .proctor import board
+    answers = clean_answers(attempt, answers)
+    if deferred and journal.enabled:
+        applied, seq = journal.append(attempt, answers, seq)
+        if applied:
+            board.answered(attempt.id, answers)
+        return applied, seq
+    with transaction.atomic(savepoint=False):
+        if seq is not None:
+            claimed = ExamResult.objects.filter(id=attempt.id, autosave_seq__lt=seq).update(
+                autosave_seq=seq, last_activity=timezone.now(),
+            )
+            if not claimed:
+                current = ExamResult.objects.values_list('autosave_seq', flat=True).get(id=attempt.id)
+                return False, current
+            attempt.autosave_seq = seq
+        if answers:
+            write_answers({(attempt.id, question_id): option_id for question_id, option_id in answers.items()})
+    board.answered(attempt.id, answers)
+    return True, seq
+
+
+def sync_batches(attempt, batches):
+    """
+    Apply the batches an offline client queued while it had no network, as
+    one write. ``batches`` is ``[{'seq': n, 'answers': {...}}, ...]``; ones not
+    newer than what the server already has are dropped, the rest are merged
+    in sequence order so the latest choice per question wins.
+
+    Returns ``(applied, seq)`` like ``apply_answers``.
+    """
+    from .journal import overlay
+    try:
+        batches = sorted(((int(batch['seq']), batch.get('answers') or {}) for batch in batches),
+                         key=lambda batch: batch[0])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        raise AnswerError("Invalid batch submitted.")
+    if not all(isinstance(answers, dict) for _, answers in batches):
+        raise AnswerError("Invalid batch submitted.")
+    current = max(attempt.autosave_seq, overlay(attempt.id)[1])
+    merged, seq = {}, None
+    for batch_seq, answers in batches:
+        if batch_seq > current:
+            merged.update(answers)
+            seq = batch_seq
+    if seq is None:
+        return False, current
+    return apply_answers(attempt, merged, seq, deferred=True)
@@ -0,0 +1,87 @@
+# exams_management/background.py
+import atexit
+import logging
+import threading
+import time
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_jobs = []
+_lock = threading.Lock()
+_stop = threading.Event()
+_thread = None
+
+
+class Job:
+    __slots__ = ('name', 'interval', 'func', 'next_run')
+
+    def __init__(self, name, interval, func):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.next_run = time.monotonic() + interval
+
+
+def register(name, interval, func):
+    """Run ``func()`` every ``interval`` seconds on the background thread."""
+    with _lock:
+        _jobs.append(Job(name, interval, func))
+
+
+def run_job(job):
+    try:
+        job.func()
+    except Exception:
+        logger.exception("Background job %s failed", job.name)
+    finally:
+        close_old_connections()
+
+
+def _loop():
+    while not _stop.is_set():
+        now = time.monotonic()
+        with _lock:
+            due = [job for job in _jobs if job.next_run <= now]
+            for job in due:
+                job.next_run = now + job.interval
+            wait = min((job.next_run for job in _jobs), default=now + 1) - now
+        for job in due:
+            run_job(job)
+        _stop.wait(max(0.05, wait))
+
+
+def start():
+    """
+    Start the service's periodic jobs on one daemon thread. Called by
+    scripts/run_service.py; under runserver and the tests the journal and
+    heartbeat registry fall back to writing inline.
+    """
+    global _thread
+    if _thread is not None:
+        return
+    from . import expiry, heartbeat, journal, proctor
+    journal.enable()
+    register('autosave-journal', journal.FLUSH_INTERVAL, journal.flush)
+    heartbeat.registry.enable()
+    register('heartbeats', heartbeat.FLUSH_INTERVAL, heartbeat.registry.flush)
+    register('expiry-sweeper', expiry.SWEEP_INTERVAL, expiry.sweep)
+    register('proctor-board', proctor.PUBLISH_INTERVAL, proctor.board.publish)
+
+    _thread = threading.Thread(target=_loop, name='exams-background', daemon=True)
+    _thread.start()
+    atexit.register(stop)
+
+
+def stop():
+    """Stop the thread and give every job one last run, e.g. to drain the journal."""
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _thread.join(timeout=10)
+    _thread = None
+    with _lock:
+        jobs = list(_jobs)
+    for job in jobs:
+        run_job(job)
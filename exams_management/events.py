@@ -0,0 +1,124 @@
+# exams_management/events.py
+import itertools
+import threading
+from collections import deque
+from django.core import signing
+from django.urls import reverse
+
+TOKEN_SALT = 'exams_management.events'
+TOKEN_MAX_AGE = 60 * 60 * 12
+HISTORY = 500
+
+
+class EventBus:
+    """
+    In-process fan-out of small JSON events to channel subscribers. Views
+    and background jobs publish from any thread; the SSE sidecar (sse.py)
+    subscribes one callback per open stream. Publishing with nobody
+    listening, e.g. under runserver, only appends to the replay history.
+    """
+
+    def __init__(self, history=HISTORY):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._subscribers = {}
+        self._history = deque(maxlen=history)
+
+    def publish(self, channels, event, data):
+        """
+        Send one event to every subscriber of any of ``channels``; a stream
+        listening on several of them still receives it once.
+        """
+        if isinstance(channels, str):
+            channels = (channels,)
+        channels = frozenset(channels)
+        with self._lock:
+            record = (next(self._ids), channels, event, data)
+            self._history.append(record)
+            deliver = set()
+            for channel in channels:
+                deliver.update(self._subscribers.get(channel, ()))
+        for callback in deliver:
+            callback(record)
+        return record[0]
+
+    def subscribe(self, channels, callback):
+        with self._lock:
+            for channel in channels:
+                self._subscribers.setdefault(channel, set()).add(callback)
+
+    def unsubscribe(self, channels, callback):
+        with self._lock:
+            for channel in channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(callback)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def latest(self):
+        with self._lock:
+            return self._history[-1][0] if self._history else 0
+
+    def since(self, last_id, channels):
+        """Events on ``channels`` after ``last_id``, for a stream that reconnected."""
+        channels = set(channels)
+        with self._lock:
+            return [record for record in self._history if record[0] > last_id and record[1] & channels]
+
+
+bus = EventBus()
+
+
+def user_channels(user, attempt_id=None):
+    """What a user may listen to: their own channel plus their grade's, or the staff channel."""
+    channels = [f'user:{user.id}']
+    if user.role in ('admin', 'teacher'):
+        channels.append('staff')
+    else:
+        profile = getattr(user, 'student_profile', None)
+        if profile is not None and profile.grade_level_id:
+            channels.append(f'grade:{profile.grade_level_id}')
+    if attempt_id is not None:
+        channels.append(f'attempt:{attempt_id}')
+    return channels
+
+
+def make_token(user, attempt_id=None, exam_id=None, extra=()):
+    """
+    Signed, expiring permission to open a stream; the sidecar never touches
+    the session. ``extra`` grants channels the calling view has already
+    authorised, e.g. an exam's proctor board.
+    """
+    channels = user_channels(user, attempt_id)
+    if exam_id is not None:
+        channels.append(f'exam:{exam_id}')
+    channels.extend(extra)
+    return signing.dumps({'c': channels, 'a': attempt_id}, salt=TOKEN_SALT, compress=True)
+
+
+def read_token(token):
+    """``(channels, attempt_id)`` from a token; raises signing.BadSignature when forged or expired."""
+    payload = signing.loads(token, salt=TOKEN_SALT, max_age=TOKEN_MAX_AGE)
+    return payload['c'], payload['a']
+
+
+def exam_changed(exam, state, **data):
+    """Tell the exam's grade, anyone sitting it and the staff that it went live, closed or was extended."""
+    bus.publish((f'grade:{exam.grade_level_id}', f'exam:{exam.id}', 'staff'), 'exam',
+                {'exam': exam.id, 'state': state, **data})
+
+
+def results_published(attempts):
+    """
+    Let each student know their result is ready to view, and the staff
+    boards once per batch: every staff event re-fetches the whole results
+    table, so a sweep of 200 attempts must not cost 200 refreshes.
+    """
+    for attempt in attempts:
+        data = {'attempt': attempt.id, 'exam': attempt.exam_id, 'score': attempt.score,
+                'url': reverse('exam:exam_results', args=[attempt.id])}
+        bus.publish(f'user:{attempt.student_id}', 'results', data)
+    if attempts:
+        bus.publish('staff', 'results', {'attempts': [attempt.id for attempt in attempts],
+                                         'exams': sorted({attempt.exam_id for attempt in attempts})})
@@ -0,0 +1,97 @@
+# exams_management/facets.py
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+LEVELS = ['subject', 'exam_board', 'exam_year', 'question_type']
+
+
+def facet_key(subject_id, exam_board_id, exam_year, question_type):
+    return f"{subject_id}:{exam_board_id or ''}:{exam_year or ''}:{question_type}"
+
+
+def apply_counts(Facet, counts, using='default'):
+    """
+    Add ``counts`` (a Counter keyed by (subject_id, board_id, year, type)) to
+    the facet table. Usable from migrations with a historical ``Facet``.
+    """
+    with transaction.atomic(using=using):
+        for (subject_id, board_id, year, question_type), delta in counts.items():
+            if not delta:
+                continue
+            key = facet_key(subject_id, board_id, year, question_type)
+            updated = Facet.objects.using(using).filter(key=key).update(count=F('count') + delta)
+            if not updated and delta > 0:
+                Facet.objects.using(using).create(
+                    key=key, subject_id=subject_id, exam_board_id=board_id,
+                    exam_year=year, question_type=question_type, count=delta,
+                )
+
+
+def count_questions(subject_id, questions, sign=1):
+    """Counter of facet deltas for question rows of (board_id, year, type)."""
+    counts = Counter()
+    for board_id, year, question_type in questions:
+        counts[(subject_id, board_id, year, question_type)] += sign
+    return counts
+
+
+def record_questions(subject_id, questions, sign=1, using='default'):
+    """Count Question instances as added to (sign=1) or removed from (sign=-1) a subject."""
+    from .models import QuestionFacet
+    apply_counts(QuestionFacet, count_questions(
+        subject_id, ((q.exam_board_id, q.exam_year, q.question_type) for q in questions), sign
+    ), using)
+
+
+def record_exam_questions(exam, sign=1, question_ids=None):
+    """Count every question of ``exam`` (or just ``question_ids``) in or out of its subject."""
+    from .models import QuestionFacet
+    questions = exam.questions.all()
+    if question_ids is not None:
+        questions = questions.filter(id__in=question_ids)
+    apply_counts(QuestionFacet, count_questions(
+        exam.subject_id, questions.values_list('exam_board_id', 'exam_year', 'question_type'), sign
+    ))
+
+
+def rebuild(Facet, Exam, using='default'):
+    """Recompute the whole table from the exam/question links."""
+    Through = Exam.questions.through
+    rows = (Through.objects.using(using)
+            .values_list('exam__subject_id', 'question__exam_board_id', 'question__exam_year', 'question__question_type')
+            .annotate(n=Count('id')))
+    with transaction.atomic(using=using):
+        Facet.objects.using(using).all().delete()
+        Facet.objects.using(using).bulk_create([
+            Facet(key=facet_key(subject_id, board_id, year, question_type), subject_id=subject_id,
+                  exam_board_id=board_id, exam_year=year, question_type=question_type, count=n)
+            for subject_id, board_id, year, question_type, n in rows
+        ], batch_size=1000)
+
+
+def facet_counts(subject=None, exam_board=None, exam_year=None, question_type=None):
+    """
+    Counts for the next level below the given selection, for example the
+    years available for JAMB Biology. Reads only the summary table, whose
+    size depends on how many distinct facets exist, not on the bank size.
+    """
+    from .models import QuestionFacet
+    selected = {'subject': subject, 'exam_board': exam_board, 'exam_year': exam_year, 'question_type': question_type}
+    facets = QuestionFacet.objects.filter(count__gt=0)
+    for level, value in selected.items():
+        if value not in (None, ''):
+            facets = facets.filter(**{level: value})
+
+    next_level = next((level for level in LEVELS if selected[level] in (None, '')), None)
+    total = facets.aggregate(total=Sum('count'))['total'] or 0
+    if next_level is None:
+        return {'total': total, 'level': None, 'facets': []}
+
+    label = {'subject': 'subject__name', 'exam_board': 'exam_board__abbreviation'}.get(next_level, next_level)
+    rows = facets.values(*dict.fromkeys([next_level, label])).annotate(count=Sum('count')).order_by(label)
+    return {
+        'total': total,
+        'level': next_level,
+        'facets': [{'value': row[next_level], 'label': row[label], 'count': row['count']} for row in rows],
+    }
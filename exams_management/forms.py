@@ -7,7 +7,7 @@ class SaveExam(forms.ModelForm):
     class Meta:
         model = Exam
         fields = '__all__'
-        fields = ["folder","title", "subject", "grade_level", "paper_type", "total_marks","window_start", "window_end", "duration", "instructions", "status", "is_active", "shuffle_options", "status", "student_question_limit"]
+        fields = ["folder","title", "subject", "grade_level", "paper_type", "total_marks","window_start", "window_end", "duration", "instructions", "status", "is_active", "shuffle_options", "dedupe_questions", "status", "student_question_limit"]
         widgets = {
             'window_start': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
             'window_end': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
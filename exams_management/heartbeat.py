@@ -0,0 +1,95 @@
+# exams_management/heartbeat.py
+import threading
+from collections import OrderedDict
+from django.utils import timezone
+from .proctor import board
+
+FLUSH_INTERVAL = 30
+SESSION_KEY = 'exam_attempts'
+MAX_FINISHED = 50000
+
+
+class HeartbeatRegistry:
+    """
+    Last time each open attempt was seen, kept in memory. ``beat`` is a dict
+    write; the background job copies what changed into
+    ``ExamResult.last_activity`` in one bulk update every FLUSH_INTERVAL.
+    Without the background thread every beat is written straight through.
+    Attempts that were submitted or expired stop counting as alive.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._seen = {}
+        self._dirty = set()
+        self._finished = OrderedDict()
+
+    def enable(self):
+        self.enabled = True
+
+    def beat(self, attempt_id, now=None):
+        """Record a sign of life; returns False if the attempt is already finished."""
+        now = now or timezone.now()
+        if not self.enabled:
+            from .models import ExamResult
+            if not ExamResult.objects.filter(id=attempt_id, submitted_at__isnull=True).update(last_activity=now):
+                return False
+            board.seen(attempt_id, now)
+            return True
+        with self._lock:
+            if attempt_id in self._finished:
+                return False
+            self._seen[attempt_id] = now
+            self._dirty.add(attempt_id)
+        board.seen(attempt_id, now)
+        return True
+
+    def last_seen(self, attempt_id):
+        with self._lock:
+            return self._seen.get(attempt_id)
+
+    def forget(self, attempt_id):
+        with self._lock:
+            self._seen.pop(attempt_id, None)
+            self._dirty.discard(attempt_id)
+
+    def finished(self, attempt_ids):
+        """Ignore further beats for ``attempt_ids``; called once their submission commits."""
+        with self._lock:
+            for attempt_id in attempt_ids:
+                self._seen.pop(attempt_id, None)
+                self._dirty.discard(attempt_id)
+                self._finished[attempt_id] = True
+            while len(self._finished) > MAX_FINISHED:
+                self._finished.popitem(last=False)
+
+    def flush(self):
+        from .models import ExamResult
+        with self._lock:
+            changed = [ExamResult(id=attempt_id, last_activity=self._seen[attempt_id]) for attempt_id in self._dirty]
+            self._dirty = set()
+        if changed:
+            ExamResult.objects.bulk_update(changed, ['last_activity'], batch_size=500)
+        return len(changed)
+
+
+registry = HeartbeatRegistry()
+
+
+def remember_attempt(session, attempt_id):
+    """Let ``ping`` accept this attempt from this session without a database read."""
+    attempts = session.get(SESSION_KEY, [])
+    if attempt_id not in attempts:
+        session[SESSION_KEY] = [*attempts, attempt_id]
+
+
+def owns_attempt(session, attempt_id):
+    return attempt_id in session.get(SESSION_KEY, ())
+
+
+def forget_attempt(session, attempt_id):
+    """Stop accepting pings for a finished attempt from this session."""
+    attempts = session.get(SESSION_KEY, [])
+    if attempt_id in attempts:
+        session[SESSION_KEY] = [pk for pk in attempts if pk != attempt_id]
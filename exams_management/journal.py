@@ -0,0 +1,272 @@
+# exams_management/journal.py
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 2
+CHECK_BATCH = 500
+
+
+class AutosaveJournal:
+    """
+    Write-behind log for autosave batches. Each accepted batch is appended
+    as one JSON line and fsynced, then acknowledged; the background flusher
+    later merges every line into ExamAnswer in a single transaction, so
+    hundreds of autosaves cost one SQLite write instead of one each. A
+    segment file is deleted only once its transaction has committed, and
+    lines that can no longer be applied (an option deleted since) go to
+    ``autosave.quarantine`` instead of holding up everyone else's.
+
+    Until ``enable()`` is called (by background.start) nothing is journaled
+    and autosaves go straight to the database.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._file = None
+        self._pending = {}
+        self._flushing = {}
+        self._seqs = {}
+
+    @property
+    def path(self):
+        return self.directory / 'autosave.log'
+
+    @property
+    def quarantine_path(self):
+        return self.directory / 'autosave.quarantine'
+
+    def segments(self):
+        return sorted(self.directory.glob('autosave.*.flushing'))
+
+    def enable(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            # Batches acknowledged before a restart stay visible until the next flush applies them.
+            self._rotate()
+            for segment in self.segments():
+                for entry in read_segment(segment):
+                    self._flushing.setdefault(entry['attempt'], {}).update(
+                        (int(question_id), option_id) for question_id, option_id in entry['answers'].items()
+                    )
+                    if entry['seq'] is not None:
+                        self._seqs[entry['attempt']] = max(self._seqs.get(entry['attempt'], 0), entry['seq'])
+        self.enabled = True
+
+    def _rotate(self):
+        """Close the live log and turn it into a segment; call with the lock held."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path.exists():
+            os.replace(self.path, self.directory / f'autosave.{time.time_ns()}.flushing')
+
+    def append(self, attempt, answers, seq=None):
+        """
+        Journal validated ``answers`` for ``attempt``. Returns ``(accepted, seq)``
+        with the same meaning as answers.apply_answers.
+        """
+        with self._lock:
+            last = max(self._seqs.get(attempt.id, 0), attempt.autosave_seq)
+            if seq is not None and seq <= last:
+                return False, last
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps({'attempt': attempt.id, 'seq': seq, 'answers': answers}) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            if seq is not None:
+                self._seqs[attempt.id] = seq
+            self._pending.setdefault(attempt.id, {}).update(answers)
+        return True, seq
+
+    def overlay(self, attempt_id):
+        """Answers and newest seq journaled for ``attempt_id`` but not yet in the database."""
+        with self._lock:
+            answers = {**self._flushing.get(attempt_id, {}), **self._pending.get(attempt_id, {})}
+            return answers, self._seqs.get(attempt_id, 0)
+
+    def flush(self):
+        """
+        Merge everything journaled so far into the database. Call it outside
+        any transaction (the background job does); inside one, segments are
+        only deleted if that transaction commits.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._rotate()
+                for attempt_id, answers in self._pending.items():
+                    self._flushing.setdefault(attempt_id, {}).update(answers)
+                self._pending = {}
+            # If a segment fails (the database is locked, say), _flushing is
+            # kept and merged with newer batches next time: those answers
+            # were acknowledged and must stay visible until they are written.
+            for segment in self.segments():
+                rejected = apply_entries(read_segment(segment))
+                if rejected:
+                    self.quarantine(rejected)
+                transaction.on_commit(segment.unlink)
+            with self._lock:
+                for attempt_id in self._flushing:
+                    if attempt_id not in self._pending:
+                        self._seqs.pop(attempt_id, None)  # the database has the newest seq now
+                self._flushing = {}
+
+    def forget(self, attempt_ids):
+        """Drop what is held in memory for submitted attempts; the flusher skips their lines."""
+        with self._lock:
+            for attempt_id in attempt_ids:
+                self._pending.pop(attempt_id, None)
+                self._flushing.pop(attempt_id, None)
+                self._seqs.pop(attempt_id, None)
+
+    def quarantine(self, entries):
+        logger.error("Quarantined %d autosave batches that no longer apply", len(entries))
+        with open(self.quarantine_path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def read_segment(path):
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue  # torn final line from a crash; the batch was never acknowledged
+    return entries
+
+
+def valid_answers(pairs):
+    """The ``(question_id, option_id)`` pairs whose option still exists and belongs to its question."""
+    from .models import QuestionOption
+    option_ids = list({option_id for _, option_id in pairs})
+    valid = set()
+    for i in range(0, len(option_ids), CHECK_BATCH):
+        valid.update((question_id, option_id) for option_id, question_id in QuestionOption.objects.filter(
+            id__in=option_ids[i:i + CHECK_BATCH]).values_list('id', 'question_id'))
+    return valid
+
+
+def apply_entries(entries):
+    """
+    Fold journal lines into ExamAnswer: later lines win per question, lines
+    not newer than the attempt's stored seq are dropped, and submitted
+    attempts are left alone. SQLite checks foreign keys only at commit, so
+    lines naming a deleted option are picked out beforehand rather than
+    left to fail the whole transaction.
+
+    Everything is written in one transaction; if that fails, each attempt
+    is retried in its own. Returns the lines that could not be applied.
+    """
+    merged = {}
+    for entry in entries:
+        merged.setdefault(entry['attempt'], []).append(entry)
+    valid = valid_answers({(int(question_id), option_id)
+                           for entry in entries for question_id, option_id in entry['answers'].items()})
+    rejected = []
+    for attempt_entries in merged.values():
+        for entry in list(attempt_entries):
+            if any((int(question_id), option_id) not in valid for question_id, option_id in entry['answers'].items()):
+                attempt_entries.remove(entry)
+                rejected.append(entry)
+
+    try:
+        with transaction.atomic():
+            write_entries(merged)
+    except IntegrityError:
+        for attempt_id, attempt_entries in merged.items():
+            try:
+                with transaction.atomic():
+                    write_entries({attempt_id: attempt_entries})
+            except IntegrityError:
+                logger.exception("Could not apply journaled autosaves for attempt %s", attempt_id)
+                rejected.extend(attempt_entries)
+    return rejected
+
+
+def write_entries(merged):
+    from .models import ExamResult
+    from .answers import write_answers
+    attempts = {
+        attempt.id: attempt
+        for attempt in ExamResult.objects.filter(id__in=merged, submitted_at__isnull=True)
+        .only('id', 'autosave_seq')
+    }
+    rows, seqs = {}, {}
+    for attempt_id, attempt_entries in merged.items():
+        attempt = attempts.get(attempt_id)
+        if attempt is None:
+            continue
+        for entry in attempt_entries:
+            seq = entry['seq']
+            if seq is not None and seq <= attempt.autosave_seq:
+                continue
+            if seq is not None:
+                seqs[attempt_id] = max(seqs.get(attempt_id, 0), seq)
+            for question_id, option_id in entry['answers'].items():
+                rows[(attempt_id, int(question_id))] = option_id
+    if rows:
+        write_answers(rows)
+    now = timezone.now()
+    touched = [attempts[attempt_id] for attempt_id in seqs]
+    for attempt in touched:
+        attempt.autosave_seq = seqs[attempt.id]
+        attempt.last_activity = now
+    ExamResult.objects.bulk_update(touched, ['autosave_seq', 'last_activity'], batch_size=500)
+    return len(rows)
+
+
+def settle(attempts):
+    """
+    Write the journaled answers of ``attempts`` in the caller's transaction,
+    so they can be scored without flushing other students' batches inside
+    it. The lines stay in the journal; the flusher skips them once the
+    attempts are submitted.
+    """
+    from .answers import write_answers
+    if not journal.enabled:
+        return 0
+    rows = {(attempt.id, question_id): option_id
+            for attempt in attempts for question_id, option_id in journal.overlay(attempt.id)[0].items()}
+    if not rows:
+        return 0
+    valid = valid_answers({(question_id, option_id) for (_, question_id), option_id in rows.items()})
+    rows = {key: option_id for key, option_id in rows.items() if (key[1], option_id) in valid}
+    if rows:
+        write_answers(rows)
+    return len(rows)
+
+
+journal = AutosaveJournal(getattr(settings, 'AUTOSAVE_JOURNAL_DIR', Path(settings.BASE_DIR) / 'journal'))
+
+
+def enable():
+    journal.enable()
+
+
+def flush():
+    if journal.enabled:
+        journal.flush()
+
+
+def overlay(attempt_id):
+    return journal.overlay(attempt_id)
+
+
+def finished(attempt_ids):
+    journal.forget(attempt_ids)
@@ -0,0 +1,61 @@
+import os
+import sys
+import sqlite3
+import subprocess
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ("Build a ready-to-copy SQLite database with every migration applied and the "
+            "past-question bank imported, for near-instant first-run installs.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(settings.QUESTION_BANK_SEED),
+                            help="Where to write the snapshot.")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Parser processes passed on to import_question_bank.")
+        parser.add_argument('--force', action='store_true', help="Overwrite an existing snapshot.")
+
+    def run(self, args, env):
+        manage_py = Path(settings.BASE_DIR) / 'manage.py'
+        result = subprocess.run([sys.executable, str(manage_py), *args], env=env,
+                                cwd=str(settings.BASE_DIR), capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommandError(f"{' '.join(args)} failed:\n{result.stdout}\n{result.stderr}")
+        return result.stdout
+
+    def handle(self, *args, **options):
+        output = Path(options['output'])
+        if output.exists() and not options['force']:
+            raise CommandError(f"{output} already exists; pass --force to rebuild it.")
+        output.parent.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            build_db = os.path.join(tmp, 'build.sqlite3')
+            env = dict(os.environ, SCHOOLMANAGER_DB=build_db)
+
+            self.stdout.write("Applying migrations to a fresh database...")
+            self.run(['migrate', '--noinput'], env)
+            # Grades and subjects come from school_management, which a fresh
+            # migrate may order after 0019; the sync fills in whatever it missed.
+            self.stdout.write("Syncing the question bank...")
+            summary = self.run(['import_question_bank', '--workers', str(options['workers'])], env)
+            for line in summary.splitlines():
+                if line.startswith('Imported'):
+                    self.stdout.write(line)
+            self.stdout.write("Clustering near-duplicate questions...")
+            self.stdout.write(self.run(['cluster_question_duplicates'], env).strip())
+
+            if output.exists():
+                output.unlink()
+            conn = sqlite3.connect(build_db)
+            try:
+                conn.execute("VACUUM INTO ?", (str(output),))
+            finally:
+                conn.close()
+
+        size = output.stat().st_size / (1024 * 1024)
+        self.stdout.write(self.style.SUCCESS(f"Seed database written to {output} ({size:.1f} MB)"))
@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from exams_management.models import Exam, Question, QuestionOption
+from exams_management.similarity import DEFAULT_THRESHOLD, cluster_questions
+
+
+class Command(BaseCommand):
+    help = ("Group near-duplicate questions across boards and years (MinHash over question and "
+            "option text) so exams can give each student at most one of them.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help="Estimated Jaccard similarity at which two questions count as duplicates.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        clustered, clusters = cluster_questions(Question, QuestionOption, threshold=options['threshold'])
+        # Cached question pools carry the cluster ids, so drop them all.
+        Exam.objects.update(pool_version=F('pool_version') + 1)
+        self.stdout.write(self.style.SUCCESS(
+            f"{clustered} questions in {clusters} near-duplicate clusters "
+            f"({time.perf_counter() - started:.1f}s)."
+        ))
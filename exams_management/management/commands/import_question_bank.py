@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from exams_management.question_bank import QuestionBankImporter, DEFAULT_BANK_DIR
+
+
+class Command(BaseCommand):
+    help = ("Sync the past-question JSON bank into one Exam per subject file. Unchanged files are "
+            "skipped and only new or changed questions are written.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=DEFAULT_BANK_DIR,
+                            help="Directory of <Subject>.json files, or a single file.")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Questions written per transaction.")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Processes used to parse subject files; writes stay on one connection.")
+
+    def handle(self, *args, **options):
+        importer = QuestionBankImporter(
+            batch_size=options['batch_size'],
+            log=lambda message: self.stdout.write(message),
+        )
+        path = options['path']
+        if path.endswith('.json'):
+            stats = importer.import_file(path)
+            self.stdout.write(f"Imported {stats}")
+        else:
+            stats = importer.import_directory(path, workers=options['workers'])
+        self.stdout.write(self.style.SUCCESS(f"Done: {stats.rate:,.0f} rows/s"))
@@ -0,0 +1,30 @@
+import shutil
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ("Copy the prebuilt question-bank database (QUESTION_BANK_SEED) into place when "
+            "no database exists yet. Called by scripts/service_manager.py before migrate.")
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', default=str(settings.QUESTION_BANK_SEED),
+                            help="The snapshot written by build_question_bank_seed.")
+        parser.add_argument('--database', default=str(settings.DATABASES['default']['NAME']),
+                            help="Where the SQLite database should live.")
+
+    def handle(self, *args, **options):
+        seed, database = Path(options['seed']), Path(options['database'])
+        if database.exists():
+            self.stdout.write(f"{database} already exists; leaving it alone.")
+            return
+        if not seed.exists():
+            self.stdout.write(f"No seed at {seed}; migrate will build the database from scratch.")
+            return
+        database.parent.mkdir(parents=True, exist_ok=True)
+        partial = database.with_name(database.name + '.partial')
+        shutil.copyfile(seed, partial)
+        partial.replace(database)  # never leave a half-copied database behind
+        self.stdout.write(self.style.SUCCESS(f"Installed the question bank from {seed}"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from exams_management import sitting
+from exams_management.models import Exam
+
+
+class Command(BaseCommand):
+    help = "Create attempts and draw questions for every student of an exam's grade ahead of the window."
+
+    def add_arguments(self, parser):
+        parser.add_argument('exam_id', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            exam = Exam.objects.get(id=options['exam_id'])
+        except Exam.DoesNotExist:
+            raise CommandError(f"Exam {options['exam_id']} does not exist.")
+        try:
+            prepared = sitting.prepare_sitting(exam)
+        except sitting.SittingError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Prepared {prepared} attempts for {exam}."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from exams_management import facets
+from exams_management.models import Exam, QuestionFacet
+
+
+class Command(BaseCommand):
+    help = "Recompute the question facet counts from scratch (after admin edits or bulk deletes)."
+
+    def handle(self, *args, **options):
+        facets.rebuild(QuestionFacet, Exam)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {QuestionFacet.objects.count()} facet rows."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from exams_management import scoring
+
+
+class Command(BaseCommand):
+    help = "Re-score submitted attempts against the current answer key."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--exam', type=int, help="Only attempts of this exam id.")
+        parser.add_argument('--question', type=int, help="Only attempts that were given this question id.")
+
+    def handle(self, *args, **options):
+        from exams_management.models import ExamResult
+        if options['question']:
+            rescored = scoring.rescore_question(options['question'])
+        elif options['exam']:
+            rescored = scoring.rescore_exam(options['exam'])
+        else:
+            rescored = scoring.rescore(ExamResult.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Re-scored {rescored} attempts."))
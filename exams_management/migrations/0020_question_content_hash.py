@@ -0,0 +1,57 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from exams_management.question_bank.importer import content_hash, chunked
+
+
+def backfill_content_hashes(apps, schema_editor):
+    """Hash the questions 0019 already imported so the first sync reuses them."""
+    Question = apps.get_model('exams_management', 'Question')
+    QuestionOption = apps.get_model('exams_management', 'QuestionOption')
+    db = schema_editor.connection.alias
+    sql = f"UPDATE {Question._meta.db_table} SET content_hash = %s WHERE id = %s"
+
+    question_ids = list(Question.objects.using(db)
+                        .filter(exam__title__endswith=' Past Questions')
+                        .distinct().order_by('id').values_list('id', flat=True))
+    with schema_editor.connection.cursor() as cursor:
+        for ids in chunked(question_ids, 2000):
+            options = {}
+            for question_id, text, is_correct in (QuestionOption.objects.using(db)
+                                                  .filter(question_id__in=ids).order_by('id')
+                                                  .values_list('question_id', 'option_text', 'is_correct')):
+                options.setdefault(question_id, []).append((text, is_correct))
+            rows = (Question.objects.using(db).filter(id__in=ids)
+                    .values_list('id', 'question_text', 'exam_board__abbreviation', 'exam_year'))
+            cursor.executemany(sql, [
+                (content_hash(text, options.get(pk, []), board, year), pk)
+                for pk, text, board, year in rows
+            ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams_management', '0019_load_pqna'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Identity of an imported bank question; empty for authored questions.', max_length=64, null=True),
+        ),
+        migrations.CreateModel(
+            name='QuestionBankSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255, unique=True)),
+                ('checksum', models.CharField(max_length=64)),
+                ('question_count', models.PositiveIntegerField(default=0)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('exam', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='exams_management.exam')),
+            ],
+        ),
+        migrations.RunPython(backfill_content_hashes, migrations.RunPython.noop),
+    ]
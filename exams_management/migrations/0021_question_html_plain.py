@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:30
+
+from django.db import migrations, models
+from exams_management.question_bank.importer import chunked
+from exams_management.text import render_question_text
+
+
+def backfill_question_text(apps, schema_editor):
+    Question = apps.get_model('exams_management', 'Question')
+    db = schema_editor.connection.alias
+    sql = f"UPDATE {Question._meta.db_table} SET question_html = %s, question_plain = %s WHERE id = %s"
+    rows = Question.objects.using(db).order_by('id').values_list('id', 'question_text')
+    with schema_editor.connection.cursor() as cursor:
+        for batch in chunked(list(rows), 2000):
+            cursor.executemany(sql, [(*render_question_text(text), pk) for pk, text in batch])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams_management', '0020_question_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='question_html',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Sanitized question_text, safe to render as-is.'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='question_plain',
+            field=models.TextField(blank=True, default='', editable=False, help_text='question_text without markup, for search and exports.'),
+        ),
+        migrations.RunPython(backfill_question_text, migrations.RunPython.noop),
+    ]
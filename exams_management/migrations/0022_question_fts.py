@@ -0,0 +1,65 @@
+# Full-text index over Question.question_plain (SQLite FTS5 only)
+
+from django.db import migrations
+
+FTS_TABLE = 'exams_management_question_fts'
+QUESTION_TABLE = 'exams_management_question'
+
+CREATE_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        question_plain, content='{QUESTION_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    # External-content table: the triggers keep it in step with every insert,
+    # update and delete, including bulk_create and queryset deletes.
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {QUESTION_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, question_plain) VALUES (new.id, new.question_plain);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {QUESTION_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, question_plain) VALUES ('delete', old.id, old.question_plain);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF question_plain ON {QUESTION_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, question_plain) VALUES ('delete', old.id, old.question_plain);
+        INSERT INTO {FTS_TABLE}(rowid, question_plain) VALUES (new.id, new.question_plain);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def create_fts(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if not cursor.fetchone()[0]:
+            print("SQLite was built without FTS5; question search falls back to substring matching.")
+            return
+        for sql in CREATE_SQL:
+            cursor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in DROP_SQL:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams_management', '0021_question_html_plain'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from exams_management import facets
+
+
+def build_facets(apps, schema_editor):
+    facets.rebuild(
+        apps.get_model('exams_management', 'QuestionFacet'),
+        apps.get_model('exams_management', 'Exam'),
+        using=schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams_management', '0022_question_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('exam_year', models.PositiveIntegerField(blank=True, null=True)),
+                ('question_type', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('exam_board', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='exams_management.examboard')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='school_management.subject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['subject', 'exam_board', 'exam_year', 'question_type'], name='exams_manag_subject_745fe5_idx')],
+            },
+        ),
+        migrations.RunPython(build_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams_management', '0023_question_facets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='dedupe_questions',
+            field=models.BooleanField(default=False, help_text='Give each student at most one question from a group of near-duplicates.'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='duplicate_cluster',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, help_text='Shared by near-duplicate questions; see cluster_question_duplicates.', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams_management', '0024_question_duplicate_cluster'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='pool_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Bumped whenever questions are attached or detached; keys the cached question pool.'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams_management', '0025_exam_pool_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamBlueprintRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField()),
+                ('year_from', models.PositiveIntegerField(blank=True, null=True)),
+                ('year_to', models.PositiveIntegerField(blank=True, null=True)),
+                ('question_type', models.CharField(blank=True, choices=[('multiple_choice', 'Multiple Choice'), ('FIB', 'Fill in the Blanks'), ('essay', 'Essay')], max_length=50)),
+                ('max_per_year', models.PositiveIntegerField(blank=True, help_text='Cap on questions from any single exam year within this quota.', null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['exam_board', 'exam_year', 'question_type'], name='exams_manag_exam_bo_da46d3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['question_type', 'exam_year'], name='exams_manag_questio_f5f8c1_idx'),
+        ),
+        migrations.AddField(
+            model_name='examblueprintrule',
+            name='exam',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blueprint_rules', to='exams_management.exam'),
+        ),
+        migrations.AddField(
+            model_name='examblueprintrule',
+            name='exam_board',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='exams_management.examboard'),
+        ),
+    ]
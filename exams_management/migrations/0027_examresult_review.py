@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams_management', '0026_exam_blueprint_rule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examresult',
+            name='review',
+            field=models.JSONField(blank=True, editable=False, help_text='Frozen at submission: questions, options, choices and marks (see review.py).', null=True),
+        ),
+    ]
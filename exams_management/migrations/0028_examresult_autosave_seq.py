@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams_management', '0027_examresult_review'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examresult',
+            name='autosave_seq',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sequence number of the last autosave batch applied.'),
+        ),
+    ]
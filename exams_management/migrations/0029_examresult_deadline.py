@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_deadlines(apps, schema_editor):
+    ExamResult = apps.get_model('exams_management', 'ExamResult')
+    db = schema_editor.connection.alias
+    attempts = list(ExamResult.objects.using(db).filter(
+        submitted_at__isnull=True, start_time__isnull=False, exam__duration__isnull=False,
+    ).select_related('exam'))
+    for attempt in attempts:
+        attempt.deadline = attempt.start_time + attempt.exam.duration
+    ExamResult.objects.using(db).bulk_update(attempts, ['deadline'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams_management', '0028_examresult_autosave_seq'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examresult',
+            name='deadline',
+            field=models.DateTimeField(blank=True, editable=False, help_text='start_time + exam duration; the expiry sweeper looks attempts up by it.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='examresult',
+            index=models.Index(condition=models.Q(('submitted_at__isnull', True)), fields=['deadline'], name='examresult_open_deadline_idx'),
+        ),
+        migrations.RunPython(backfill_deadlines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:06
+
+from django.db import migrations, models
+
+
+def pack_question_ids(apps, schema_editor):
+    ExamResult = apps.get_model('exams_management', 'ExamResult')
+    Through = ExamResult.questions.through
+    db = schema_editor.connection.alias
+    packed = {}
+    for attempt_id, question_id in (Through.objects.using(db).order_by('id')
+                                    .values_list('examresult_id', 'question_id').iterator(chunk_size=5000)):
+        packed.setdefault(attempt_id, []).append(question_id)
+    ExamResult.objects.using(db).bulk_update(
+        [ExamResult(id=attempt_id, question_ids=question_ids) for attempt_id, question_ids in packed.items()],
+        ['question_ids'], batch_size=500,
+    )
+
+
+def unpack_question_ids(apps, schema_editor):
+    ExamResult = apps.get_model('exams_management', 'ExamResult')
+    Through = ExamResult.questions.through
+    db = schema_editor.connection.alias
+    Through.objects.using(db).bulk_create([
+        Through(examresult_id=attempt_id, question_id=question_id)
+        for attempt_id, question_ids in ExamResult.objects.using(db).values_list('id', 'question_ids')
+        for question_id in question_ids
+    ], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams_management', '0029_examresult_deadline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examresult',
+            name='question_ids',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text="The attempt's questions in the order they were drawn."),
+        ),
+        migrations.RunPython(pack_question_ids, unpack_question_ids),
+        migrations.RemoveField(
+            model_name='examresult',
+            name='questions',
+        ),
+    ]
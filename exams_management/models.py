@@ -1,8 +1,14 @@
 # exam_management/models.py
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 from school_management.models import Grade, Subject
 from django.utils import timezone
+from . import answer_keys
+from .paper import forget_paper
+from .sampling import forget_pool
+from .text import render_question_text
 
 class Folder(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -34,11 +40,33 @@ class Question(models.Model):
     media = models.FileField(upload_to='questions/', null=True, blank=True)
     exam_board = models.ForeignKey('ExamBoard', on_delete=models.SET_NULL, null=True, blank=True)
     exam_year = models.PositiveIntegerField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True, editable=False,
+                                    help_text="Identity of an imported bank question; empty for authored questions.")
+    question_html = models.TextField(blank=True, default='', editable=False,
+                                     help_text="Sanitized question_text, safe to render as-is.")
+    question_plain = models.TextField(blank=True, default='', editable=False,
+                                      help_text="question_text without markup, for search and exports.")
+    duplicate_cluster = models.PositiveIntegerField(null=True, blank=True, db_index=True, editable=False,
+                                                    help_text="Shared by near-duplicate questions; see cluster_question_duplicates.")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['exam_board', 'exam_year', 'question_type']),
+            models.Index(fields=['question_type', 'exam_year']),
+        ]
     
     def clean(self):
         if self.question_type == 'multiple_choice' and not self.options.filter(is_correct=True).exists():
             raise ValidationError("Multiple-choice questions must have a correct option.")
 
+    def save(self, *args, **kwargs):
+        # bulk_create skips this, so the importer fills the same columns itself.
+        self.question_html, self.question_plain = render_question_text(self.question_text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'question_text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'question_html', 'question_plain'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.question_text
 
@@ -50,6 +78,15 @@ class QuestionOption(models.Model):
 
     def __str__(self):
         return self.option_text or f"Option for {self.question.id}"
+
+
+@receiver(post_save, sender=QuestionOption)
+@receiver(post_delete, sender=QuestionOption)
+def forget_answer_key(sender, instance, **kwargs):
+    # A signal rather than save()/delete(), so queryset and cascade deletes
+    # (a Question deleted with its options) drop the cached key too.
+    answer_keys.forget([instance.question_id])
+
     
 class Exam(models.Model):
     STATUS_CHOICE = [('draft', 'Draft'), ('complete', 'Complete')]
@@ -65,6 +102,9 @@ class Exam(models.Model):
     is_active = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     shuffle_options = models.BooleanField(default=False)
+    dedupe_questions = models.BooleanField(default=False, help_text="Give each student at most one question from a group of near-duplicates.")
+    pool_version = models.PositiveIntegerField(default=0, editable=False,
+                                               help_text="Bumped whenever questions are attached or detached; keys the cached question pool.")
     student_question_limit = models.PositiveIntegerField(default=0, help_text="How many questions a student should answer.")
     questions = models.ManyToManyField(Question)
     status = models.CharField(
@@ -90,8 +130,12 @@ class Exam(models.Model):
     #     return sum(question.marks for question in self.questions.all())
 
     def save(self, *args, **kwargs):
-        # is_new = self.pk is None
+        is_new = self.pk is None
         super().save(*args, **kwargs)
+        if is_new:
+            # Ids come back after a rolled-back insert; never serve that paper or pool.
+            forget_paper(self.pk)
+            forget_pool(self)
         
         # if is_new and not self.student_question_limit:
         #     self.student_question_limit = self.questions.count()
@@ -102,29 +146,44 @@ class Exam(models.Model):
 
 class ExamResult(models.Model):
     exam = models.ForeignKey(Exam, on_delete=models.CASCADE)
-    questions = models.ManyToManyField(Question, blank=True)
+    question_ids = models.JSONField(default=list, blank=True, editable=False,
+                                    help_text="The attempt's questions in the order they were drawn.")
     student = models.ForeignKey('core.User', on_delete=models.CASCADE)
     start_time = models.DateTimeField(null=True, blank=True)
+    deadline = models.DateTimeField(null=True, blank=True, editable=False,
+                                    help_text="start_time + exam duration; the expiry sweeper looks attempts up by it.")
     last_activity = models.DateTimeField(auto_now=True) 
     submitted_at = models.DateTimeField(null=True, blank=True)
     score = models.IntegerField(null=True, blank=True)
     highest_score = models.IntegerField(null=True, blank=True)
+    autosave_seq = models.PositiveIntegerField(default=0, editable=False,
+                                               help_text="Sequence number of the last autosave batch applied.")
+    review = models.JSONField(null=True, blank=True, editable=False,
+                              help_text="Frozen at submission: questions, options, choices and marks (see review.py).")
     def calculate_score(self):
-        etm = self.exam.total_marks
-        correct_answers = sum(
-            1 for answer in self.answers.all()
-            if answer.selected_option and answer.selected_option.is_correct
-        )
-        self.highest_score = etm
-        total_score = (correct_answers * etm) / self.exam.student_question_limit
-        return round(total_score, 2)
-
+        from .scoring import score_for
+        correct_answers = self.answers.filter(selected_option__is_correct=True).count()
+        self.highest_score = self.exam.total_marks
+        return score_for(self.exam, correct_answers)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['deadline'], condition=models.Q(submitted_at__isnull=True),
+                         name='examresult_open_deadline_idx'),
+        ]
 
+    def save(self, *args, **kwargs):
+        if self.deadline is None and self.start_time and self.exam.duration:
+            self.deadline = self.start_time + self.exam.duration
+        super().save(*args, **kwargs)
 
     def has_expired(self):
         if self.submitted_at:
             return True
+        if self.deadline:
+            return timezone.now() > self.deadline
+        if self.start_time is None:
+            return False  # prepared by prepare_sitting, not started yet
         elapsed = timezone.now() - self.start_time
         return elapsed.total_seconds() > self.exam.duration.total_seconds()
 
@@ -149,6 +208,72 @@ class ExamBoard(models.Model):
     def __str__(self):
         return self.name
 
+class QuestionFacet(models.Model):
+    """
+    Running count of questions per subject, board, year and type. Kept up to
+    date by the importer and the exam editing views (see facets.py) so that
+    browsing the bank never has to GROUP BY over Question.
+    """
+    key = models.CharField(max_length=100, unique=True)
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
+    exam_board = models.ForeignKey(ExamBoard, on_delete=models.CASCADE, null=True, blank=True)
+    exam_year = models.PositiveIntegerField(null=True, blank=True)
+    question_type = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['subject', 'exam_board', 'exam_year', 'question_type']),
+        ]
+
+    def __str__(self):
+        return f"{self.key}: {self.count}"
+
+class ExamBlueprintRule(models.Model):
+    """
+    One quota of an exam blueprint, e.g. "10 from JAMB 2015-2020" or
+    "5 essay, at most 3 per year". Empty filters match any question on the
+    paper; see sampling.select_by_blueprint.
+    """
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='blueprint_rules')
+    count = models.PositiveIntegerField()
+    exam_board = models.ForeignKey(ExamBoard, on_delete=models.CASCADE, null=True, blank=True)
+    year_from = models.PositiveIntegerField(null=True, blank=True)
+    year_to = models.PositiveIntegerField(null=True, blank=True)
+    question_type = models.CharField(max_length=50, blank=True, choices=Question._meta.get_field('question_type').choices)
+    max_per_year = models.PositiveIntegerField(null=True, blank=True,
+                                               help_text="Cap on questions from any single exam year within this quota.")
+
+    class Meta:
+        ordering = ['id']
+
+    def clean(self):
+        if self.year_from and self.year_to and self.year_from > self.year_to:
+            raise ValidationError("The first year must not be after the last year.")
+
+    def __str__(self):
+        parts = [str(self.count)]
+        if self.question_type:
+            parts.append(self.get_question_type_display())
+        if self.exam_board_id:
+            parts.append(f"from {self.exam_board.abbreviation}")
+        if self.year_from or self.year_to:
+            parts.append(f"{self.year_from or '...'}-{self.year_to or '...'}")
+        if self.max_per_year:
+            parts.append(f"at most {self.max_per_year} per year")
+        return ' '.join(parts)
+
+class QuestionBankSource(models.Model):
+    """One past-question file and the checksum it had when last synced."""
+    filename = models.CharField(max_length=255, unique=True)
+    checksum = models.CharField(max_length=64)
+    exam = models.ForeignKey(Exam, on_delete=models.SET_NULL, null=True, blank=True)
+    question_count = models.PositiveIntegerField(default=0)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.filename
+
 
 
 
@@ -0,0 +1,165 @@
+# exams_management/paper.py
+import random
+import threading
+from collections import OrderedDict
+from . import answer_keys
+
+MAX_PAPERS = 16
+# Pools up to this size are snapshotted whole when the paper is built;
+# bigger ones (a subject's full past-question bank) only keep the
+# questions attempts have actually drawn.
+FULL_SNAPSHOT_QUESTIONS = 2000
+
+_papers = OrderedDict()
+_building = {}
+_lock = threading.Lock()
+
+
+class OptionRecord:
+    __slots__ = ('id', 'option_text')
+
+    def __init__(self, id, option_text):
+        self.id = id
+        self.option_text = option_text
+
+
+class QuestionRecord:
+    """What the exam page needs of a question; the answer key stays out."""
+    __slots__ = ('id', 'question_html', 'question_type', 'marks', 'options')
+
+    def __init__(self, id, question_html, question_type, marks):
+        self.id = id
+        self.question_html = question_html
+        self.question_type = question_type
+        self.marks = marks
+        self.options = []
+
+    def shuffled(self, rng):
+        """A copy with the options in the order drawn from ``rng``."""
+        record = QuestionRecord(self.id, self.question_html, self.question_type, self.marks)
+        record.options = list(self.options)
+        rng.shuffle(record.options)
+        return record
+
+
+class Paper:
+    """
+    Snapshot of the questions on an exam, shared by all attempts for one
+    ``Exam.pool_version``. Attempts only hold question ids and pick their
+    records from here. A ``complete`` paper holds the whole pool; otherwise
+    it starts empty and keeps each question the first time one is drawn.
+    Records themselves are never modified once stored.
+    """
+    __slots__ = ('exam_id', 'version', 'questions', 'complete', '_lock')
+
+    def __init__(self, exam_id, version, questions, complete=True):
+        self.exam_id = exam_id
+        self.version = version
+        self.questions = questions
+        self.complete = complete
+        self._lock = threading.Lock()
+
+    def pick(self, question_ids):
+        """Records for ``question_ids`` in that order, loading any not held yet."""
+        missing = [pk for pk in question_ids if pk not in self.questions]
+        extra = load_records(missing) if missing else {}
+        if extra and not self.complete:
+            with self._lock:
+                self.questions.update(extra)
+        # A complete paper does not keep extras: they left the pool since the attempt drew them.
+        return [self.questions.get(pk) or extra[pk] for pk in question_ids if pk in self.questions or pk in extra]
+
+
+def load_records(question_ids=None, exam=None):
+    """
+    ``{id: QuestionRecord}`` for an exam's questions or explicit ids, in two
+    queries. Primes the answer-key cache on the way.
+    """
+    from .models import Question, QuestionOption
+    questions = exam.questions.all() if exam is not None else Question.objects.filter(id__in=question_ids)
+    options = (QuestionOption.objects.filter(question__exam=exam) if exam is not None
+               else QuestionOption.objects.filter(question_id__in=question_ids))
+
+    records = {
+        pk: QuestionRecord(pk, html, question_type, marks)
+        for pk, html, question_type, marks in questions.order_by('id').values_list(
+            'id', 'question_html', 'question_type', 'marks')
+    }
+    keys = {pk: ([], []) for pk in records}
+    for pk, question_id, option_text, is_correct in options.order_by('id').values_list(
+            'id', 'question_id', 'option_text', 'is_correct'):
+        record = records.get(question_id)
+        if record is not None:
+            record.options.append(OptionRecord(pk, option_text))
+            keys[question_id][0].append(pk)
+            if is_correct:
+                keys[question_id][1].append(pk)
+    # The key never reaches the records, but it was read anyway.
+    answer_keys.prime({pk: (frozenset(valid), frozenset(correct)) for pk, (valid, correct) in keys.items()})
+    return records
+
+
+def _cached(exam):
+    """The current paper for ``exam`` if there is one; call with ``_lock`` held."""
+    paper = _papers.get(exam.id)
+    if paper is not None and paper.version == exam.pool_version:
+        _papers.move_to_end(exam.id)
+        return paper
+    return None
+
+
+def build_paper(exam):
+    from .sampling import question_pool
+    if len(question_pool(exam)) <= FULL_SNAPSHOT_QUESTIONS:
+        return Paper(exam.id, exam.pool_version, load_records(exam=exam))
+    return Paper(exam.id, exam.pool_version, {}, complete=False)
+
+
+def get_paper(exam):
+    """
+    The snapshot for ``exam``, rebuilt once whenever its pool_version moves
+    on. Requests arriving together when the window opens wait on the exam's
+    build lock instead of each reading the pool.
+    """
+    with _lock:
+        paper = _cached(exam)
+        if paper is not None:
+            return paper
+        building = _building.setdefault(exam.id, threading.Lock())
+
+    with building:
+        with _lock:
+            paper = _cached(exam)
+        if paper is not None:
+            return paper
+        paper = build_paper(exam)
+        with _lock:
+            _papers[exam.id] = paper
+            _papers.move_to_end(exam.id)
+            while len(_papers) > MAX_PAPERS:
+                evicted, _ = _papers.popitem(last=False)
+                _building.pop(evicted, None)
+    return paper
+
+
+def attempt_questions(exam, attempt_id, question_ids):
+    """
+    What one attempt is shown: its questions in draw order or, when the exam
+    asks for shuffling, with the questions and then each question's options
+    reordered: the questions by a PRNG seeded on the attempt id, each
+    question's options by one seeded on (attempt id, question id), so a
+    change to one question never reorders another. Every page that renders
+    the attempt gets the same order without it being stored anywhere, and
+    the shared snapshot itself is never reordered.
+    """
+    records = get_paper(exam).pick(question_ids)
+    if exam.shuffle_options:
+        random.Random(attempt_id).shuffle(records)
+        records = [record.shuffled(random.Random(f'{attempt_id}:{record.id}')) for record in records]
+    return records
+
+
+def forget_paper(exam_id):
+    with _lock:
+        _papers.pop(exam_id, None)
+        _building.pop(exam_id, None)
@@ -0,0 +1,184 @@
+# exams_management/proctor.py
+import threading
+from datetime import timedelta
+from . import events
+
+PUBLISH_INTERVAL = 3
+OFFLINE_AFTER = timedelta(seconds=60)
+
+
+def channel(exam_id):
+    return f'proctor:{exam_id}'
+
+
+def display_name(first_name, last_name, email):
+    return f"{first_name} {last_name}".strip() or email
+
+
+class AttemptProgress:
+    __slots__ = ('attempt_id', 'student', 'answered', 'last_seen', 'deadline', 'disconnects', 'streaming')
+
+    def __init__(self, attempt_id, student, deadline, last_seen=None, answered=()):
+        self.attempt_id = attempt_id
+        self.student = student
+        self.answered = set(answered)
+        self.last_seen = last_seen
+        self.deadline = deadline
+        self.disconnects = 0
+        self.streaming = False
+
+    def as_dict(self):
+        return {
+            'attempt': self.attempt_id,
+            'student': self.student,
+            'answered': len(self.answered),
+            'last_seen': int(self.last_seen.timestamp() * 1000) if self.last_seen else None,
+            'deadline': int(self.deadline.timestamp() * 1000) if self.deadline else None,
+            'disconnects': self.disconnects,
+        }
+
+
+class ProctorBoard:
+    """
+    Live progress of every running attempt of the exams someone is
+    watching. An exam's board is read from the database once, when its
+    dashboard first opens; after that the autosave, ping and event-stream
+    paths keep it current with dict updates, and a background job pushes
+    what changed to the dashboards every PUBLISH_INTERVAL. Exams nobody
+    watches cost one dict miss per update.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._exams = {}
+        self._attempts = {}
+        self._dirty = {}
+        self._gone = {}
+
+    def watch(self, exam):
+        """The board for ``exam``, loading it on first use."""
+        with self._lock:
+            loaded = exam.id in self._exams
+        if not loaded:
+            board = load_progress(exam)
+            with self._lock:
+                if exam.id not in self._exams:
+                    self._exams[exam.id] = board
+                    for progress in board.values():
+                        self._attempts[progress.attempt_id] = (exam.id, progress)
+        return self.snapshot(exam.id)
+
+    def snapshot(self, exam_id):
+        with self._lock:
+            return [progress.as_dict() for progress in self._exams.get(exam_id, {}).values()]
+
+    def _touch(self, attempt_id):
+        """Progress for ``attempt_id`` if its exam is watched; call with the lock held."""
+        entry = self._attempts.get(attempt_id)
+        if entry is None:
+            return None
+        exam_id, progress = entry
+        self._dirty.setdefault(exam_id, set()).add(attempt_id)
+        return progress
+
+    def started(self, attempt, student):
+        """``student`` sat down to ``attempt``; shows up at once on a board already open."""
+        name = display_name(student.first_name, student.last_name, student.email)
+        with self._lock:
+            board = self._exams.get(attempt.exam_id)
+            if board is None:
+                return
+            progress = AttemptProgress(attempt.id, name, attempt.deadline, attempt.start_time)
+            board[attempt.id] = progress
+            self._attempts[attempt.id] = (attempt.exam_id, progress)
+            self._dirty.setdefault(attempt.exam_id, set()).add(attempt.id)
+
+    def answered(self, attempt_id, question_ids):
+        with self._lock:
+            progress = self._touch(attempt_id)
+            if progress is not None:
+                progress.answered.update(question_ids)
+
+    def seen(self, attempt_id, now):
+        with self._lock:
+            progress = self._touch(attempt_id)
+            if progress is None:
+                return
+            if progress.last_seen and now - progress.last_seen > OFFLINE_AFTER and not progress.streaming:
+                progress.disconnects += 1  # came back after going quiet
+            progress.last_seen = now
+
+    def streaming(self, attempt_id, connected):
+        """The attempt's event stream opened or dropped; a drop counts as a disconnect."""
+        with self._lock:
+            progress = self._touch(attempt_id)
+            if progress is None:
+                return
+            if progress.streaming and not connected:
+                progress.disconnects += 1
+            progress.streaming = connected
+
+    def extended(self, exam_id, extra):
+        with self._lock:
+            for progress in self._exams.get(exam_id, {}).values():
+                if progress.deadline:
+                    progress.deadline += extra
+                    self._dirty.setdefault(exam_id, set()).add(progress.attempt_id)
+
+    def finished(self, attempt_ids):
+        with self._lock:
+            for attempt_id in attempt_ids:
+                entry = self._attempts.pop(attempt_id, None)
+                if entry is not None:
+                    exam_id, _ = entry
+                    self._exams[exam_id].pop(attempt_id, None)
+                    self._gone.setdefault(exam_id, set()).add(attempt_id)
+                    self._dirty.get(exam_id, set()).discard(attempt_id)
+
+    def forget(self, exam_id):
+        with self._lock:
+            for attempt_id in self._exams.pop(exam_id, {}):
+                self._attempts.pop(attempt_id, None)
+            self._dirty.pop(exam_id, None)
+            self._gone.pop(exam_id, None)
+
+    def publish(self):
+        """Push one 'progress' event per watched exam with the rows that changed."""
+        with self._lock:
+            changes = {
+                exam_id: ([self._exams[exam_id][pk].as_dict() for pk in self._dirty.get(exam_id, ())
+                           if pk in self._exams[exam_id]], sorted(self._gone.get(exam_id, ())))
+                for exam_id in set(self._dirty) | set(self._gone) if exam_id in self._exams
+            }
+            self._dirty, self._gone = {}, {}
+        for exam_id, (rows, finished) in changes.items():
+            if rows or finished:
+                events.bus.publish(channel(exam_id), 'progress', {'attempts': rows, 'finished': finished})
+        return len(changes)
+
+
+def load_progress(exam):
+    """
+    ``{attempt_id: AttemptProgress}`` for the exam's running attempts: the
+    attempts and their answered questions in two queries, plus whatever
+    the autosave journal holds that has not reached the database yet.
+    """
+    from .models import ExamAnswer, ExamResult
+    from .heartbeat import registry
+    from .journal import overlay
+    board = {}
+    for pk, first_name, last_name, email, deadline, last_activity in (
+            ExamResult.objects.filter(exam=exam, submitted_at__isnull=True, start_time__isnull=False)
+            .values_list('id', 'student__first_name', 'student__last_name', 'student__email',
+                         'deadline', 'last_activity')):
+        board[pk] = AttemptProgress(pk, display_name(first_name, last_name, email), deadline,
+                                    registry.last_seen(pk) or last_activity)
+    for attempt_id, question_id in (ExamAnswer.objects.filter(attempt_id__in=board, selected_option__isnull=False)
+                                    .values_list('attempt_id', 'question_id')):
+        board[attempt_id].answered.add(question_id)
+    for attempt_id, progress in board.items():
+        progress.answered.update(overlay(attempt_id)[0])
+    return board
+
+
+board = ProctorBoard()
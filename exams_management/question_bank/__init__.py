@@ -0,0 +1,2 @@
+from .importer import QuestionBankImporter, ImportStats, DEFAULT_BANK_DIR, normalize_record, parse_exam_year
+from .reader import iter_questions
@@ -0,0 +1,427 @@
+# exams_management/question_bank/importer.py
+import os
+import re
+import json
+import time
+import hashlib
+from datetime import timedelta
+from django.apps import apps as global_apps
+from django.db import transaction
+from .. import facets, sampling
+from ..text import render_question_text
+from .reader import iter_questions
+
+DEFAULT_BANK_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations', 'ss3qna')
+DEFAULT_BOARD = 'WAEC'
+DEFAULT_GRADE = 'SSS 3'
+DEFAULT_FOLDER = 'Senior Secondary'
+
+OPTIONAL_FIELDS = ('content_hash', 'question_html', 'question_plain')
+
+YEAR_RE = re.compile(r"\d{4}")
+BOARD_RE = re.compile(r"[A-Z]+")
+
+
+def parse_exam_year(value):
+    """Split a raw "JAMB\\n   1978" label into ('JAMB', 1978)."""
+    value = value or ''
+    year_match = YEAR_RE.search(value)
+    board_match = BOARD_RE.search(value)
+    year = int(year_match.group(0)) if year_match else None
+    board = board_match.group(0) if board_match else DEFAULT_BOARD
+    return board, year
+
+
+def content_hash(question_text, options, board, year):
+    """
+    Stable identity of a bank question: its text, its options in order with
+    their correctness (which encodes the answer key), the board and the year.
+    """
+    payload = json.dumps(
+        [question_text, [[text, bool(is_correct)] for text, is_correct in options], (board or '').upper(), year],
+        ensure_ascii=False, separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def normalize_record(qdata):
+    """Turn one raw past-question record into plain, model-free values."""
+    board, year = parse_exam_year(qdata.get('exam_year', ''))
+    answer = (qdata.get('answer') or '').upper()
+    options = [
+        (text, key.upper() == answer)
+        for key, text in (qdata.get('options') or {}).items()
+    ]
+    question_html, question_plain = render_question_text(qdata['question_text'])
+    return {
+        'question_text': qdata['question_text'],
+        'question_html': question_html,
+        'question_plain': question_plain,
+        'question_type': 'multiple_choice' if options else 'essay',
+        'marks': qdata.get('marks', 1),
+        'media': qdata.get('media'),
+        'board': board,
+        'year': year,
+        'options': options,
+        'content_hash': content_hash(qdata['question_text'], options, board, year),
+    }
+
+
+def read_normalized(file_path):
+    """Stream normalized records so only one batch is ever held in memory."""
+    for qdata in iter_questions(file_path):
+        yield normalize_record(qdata)
+
+
+def file_checksum(file_path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def subject_name_for(filename):
+    return os.path.splitext(filename)[0].replace('_', ' ').title()
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ImportStats:
+    def __init__(self):
+        self.files = 0
+        self.unchanged = 0
+        self.questions = 0
+        self.options = 0
+        self.retired = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rows(self):
+        return self.questions + self.options
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"{self.files} files ({self.unchanged} unchanged), {self.questions} questions, "
+                f"{self.options} options, {self.retired} retired "
+                f"in {self.elapsed:.1f}s ({self.rate:,.0f} rows/s)")
+
+
+class FileImport:
+    """
+    Writer-side state for one subject file: the exam it feeds, the content
+    hashes that exam already holds and the hashes seen so far in the file.
+    Records whose hash is already present are skipped, so a re-sync only
+    inserts new or changed questions.
+    """
+
+    def __init__(self, importer, file_path, subject_id, subject_name, source=None, checksum=None):
+        self.importer = importer
+        self.file_path = file_path
+        self.subject_name = subject_name
+        self.source = source
+        self.checksum = checksum
+        self.exam = importer.exam_for(subject_id, subject_name, source)
+        self.known, self.duplicates = importer.known_hashes(self.exam)
+        self.seen = set()
+        self.loaded = 0
+
+    def write(self, records, stats):
+        fresh = []
+        for record in records:
+            digest = record['content_hash']
+            if digest in self.seen:
+                continue
+            self.seen.add(digest)
+            if digest not in self.known:
+                fresh.append(record)
+        if fresh:
+            questions, options = self.importer.write_batch(self.exam, fresh)
+            self.loaded += questions
+            stats.questions += questions
+            stats.options += options
+
+    def finish(self, stats):
+        stale = [pk for digest, pk in self.known.items() if digest not in self.seen] + self.duplicates
+        stats.retired += self.importer.retire(self.exam, stale)
+        self.importer.record_source(self)
+        stats.files += 1
+        self.importer.log(f"Loaded {self.loaded} questions for subject {self.subject_name}")
+
+
+class QuestionBankImporter:
+    """
+    Loads the past-question JSON bank with batched inserts.
+
+    Works with both the live models and the historical ones handed to a
+    migration (pass the migration's ``apps``). Lookups for boards, subjects,
+    the grade and the folder are resolved once up front, and every batch is
+    written in its own short transaction so SQLite's write lock is released
+    between batches.
+
+    Once ``Question.content_hash`` and ``QuestionBankSource`` exist the import
+    is an incremental sync: files whose checksum has not changed are skipped,
+    each subject keeps a single "Past Questions" exam, only unseen questions
+    are inserted, and questions dropped from a file are detached from it.
+    """
+
+    def __init__(self, apps=global_apps, batch_size=1000, using='default', log=print):
+        self.batch_size = batch_size
+        self.using = using
+        self.log = log
+
+        self.Grade = apps.get_model('school_management', 'Grade')
+        self.Subject = apps.get_model('school_management', 'Subject')
+        self.Folder = apps.get_model('exams_management', 'Folder')
+        self.Question = apps.get_model('exams_management', 'Question')
+        self.QuestionOption = apps.get_model('exams_management', 'QuestionOption')
+        self.Exam = apps.get_model('exams_management', 'Exam')
+        self.ExamResult = apps.get_model('exams_management', 'ExamResult')
+        self.ExamBoard = apps.get_model('exams_management', 'ExamBoard')
+        self.Source = self.optional_model(apps, 'QuestionBankSource')
+        self.Facet = self.optional_model(apps, 'QuestionFacet')
+        field_names = {f.name for f in self.Question._meta.get_fields()}
+        self.tracks_hashes = 'content_hash' in field_names
+        # Precomputed columns that later migrations add; historical models
+        # handed to older migrations simply do not get them.
+        self.extra_fields = [name for name in OPTIONAL_FIELDS if name in field_names]
+        self.versions_pools = 'pool_version' in {f.name for f in self.Exam._meta.get_fields()}
+        self.packs_attempts = 'question_ids' in {f.name for f in self.ExamResult._meta.get_fields()}
+
+        self._boards = None
+        self._subjects = None
+        self._grade = None
+        self._folder = None
+
+    @staticmethod
+    def optional_model(apps, name):
+        """Models added after 0019 are missing from the apps that migration passes in."""
+        try:
+            return apps.get_model('exams_management', name)
+        except LookupError:
+            return None
+
+    def record_facets(self, subject_id, rows, sign=1):
+        if self.Facet is not None:
+            facets.apply_counts(self.Facet, facets.count_questions(subject_id, rows, sign), self.using)
+
+    def touch_pool(self, exam):
+        if self.versions_pools:
+            sampling.bump_pool_version(exam.id, self.using, Exam=self.Exam)
+
+    # -- lookups resolved once per run -------------------------------------
+
+    def board_id(self, abbreviation):
+        if self._boards is None:
+            self._boards = {
+                abbr.upper(): pk
+                for pk, abbr in self.ExamBoard.objects.using(self.using).values_list('id', 'abbreviation')
+            }
+        return self._boards.get(abbreviation.upper())
+
+    def find_subject(self, name):
+        if self._subjects is None:
+            self._subjects = list(
+                self.Subject.objects.using(self.using).order_by('id').values_list('id', 'name')
+            )
+        needle = name.lower()
+        for pk, subject_name in self._subjects:
+            if needle in subject_name.lower():
+                return pk
+        return None
+
+    def grade(self):
+        if self._grade is None:
+            self._grade = self.Grade.objects.using(self.using).get(name=DEFAULT_GRADE)
+        return self._grade
+
+    def folder(self):
+        if self._folder is None:
+            self._folder, _ = self.Folder.objects.using(self.using).get_or_create(
+                name=DEFAULT_FOLDER,
+                defaults={'description': 'Senior Secondary Past Questions'}
+            )
+        return self._folder
+
+    def subject_for_file(self, file_path):
+        """Return (subject_id, subject_name) for a bank file, logging misses."""
+        subject_name = subject_name_for(os.path.basename(file_path))
+        subject_id = self.find_subject(subject_name)
+        if not subject_id:
+            self.log(f"Subject {subject_name} not found.")
+        return subject_id, subject_name
+
+    # -- sync bookkeeping --------------------------------------------------
+
+    def exam_for(self, subject_id, subject_name, source=None):
+        """Reuse the subject's "Past Questions" exam instead of creating another."""
+        if source is not None and source.exam_id:
+            return source.exam
+        title = f"{subject_name} Past Questions"
+        exam = None
+        if self.Source is not None:
+            exam = self.Exam.objects.using(self.using).filter(
+                title=title, subject_id=subject_id
+            ).order_by('id').first()
+        return exam or self.Exam.objects.using(self.using).create(
+            folder=self.folder(),
+            title=title,
+            subject_id=subject_id,
+            paper_type='practice',
+            grade_level=self.grade(),
+            duration=timedelta(minutes=15),
+            instructions='Answer all questions.',
+        )
+
+    def known_hashes(self, exam):
+        """Map content hash -> question id for ``exam``, plus ids of repeated hashes."""
+        known, duplicates = {}, []
+        if not self.tracks_hashes:
+            return known, duplicates
+        rows = (exam.questions.using(self.using).exclude(content_hash=None)
+                .order_by('id').values_list('content_hash', 'id'))
+        for digest, pk in rows:
+            if digest in known:
+                duplicates.append(pk)
+            else:
+                known[digest] = pk
+        return known, duplicates
+
+    def retire(self, exam, question_ids):
+        """
+        Detach questions that are no longer in the source file. Rows nobody has
+        answered or been served are deleted; the rest stay for old results.
+        """
+        if not question_ids:
+            return 0
+        Through = self.Exam.questions.through
+        with transaction.atomic(using=self.using):
+            self.record_facets(exam.subject_id, self.Question.objects.using(self.using).filter(
+                id__in=question_ids).values_list('exam_board_id', 'exam_year', 'question_type'), sign=-1)
+            Through.objects.using(self.using).filter(exam_id=exam.id, question_id__in=question_ids).delete()
+            unused = self.Question.objects.using(self.using).filter(
+                id__in=question_ids, exam__isnull=True, examanswer__isnull=True,
+            )
+            if self.packs_attempts:
+                served = {pk for _, pk in sampling.attempts_serving(question_ids, self.using, self.ExamResult)}
+                unused = unused.exclude(id__in=served)
+            else:
+                unused = unused.filter(examresult__isnull=True)
+            unused.delete()
+            self.touch_pool(exam)
+        return len(question_ids)
+
+    def prepare_file(self, file_path, stats):
+        """
+        Return a ``FileImport`` for ``file_path``, or None when the subject is
+        unknown or the file is unchanged since the last sync.
+        """
+        subject_id, subject_name = self.subject_for_file(file_path)
+        if not subject_id:
+            return None
+        source = checksum = None
+        if self.Source is not None:
+            checksum = file_checksum(file_path)
+            source = self.Source.objects.using(self.using).filter(filename=os.path.basename(file_path)).first()
+            if source and source.checksum == checksum and source.exam_id:
+                stats.unchanged += 1
+                self.log(f"Unchanged {os.path.basename(file_path)}, skipped.")
+                return None
+        return FileImport(self, file_path, subject_id, subject_name, source, checksum)
+
+    def record_source(self, file_import):
+        if self.Source is None:
+            return
+        source = file_import.source or self.Source(filename=os.path.basename(file_import.file_path))
+        source.checksum = file_import.checksum
+        source.exam = file_import.exam
+        source.question_count = len(file_import.seen)
+        source.save(using=self.using)
+
+    # -- writing -----------------------------------------------------------
+
+    def write_batch(self, exam, records):
+        """Insert one batch of normalized records and attach them to ``exam``."""
+        Through = self.Exam.questions.through
+        with transaction.atomic(using=self.using):
+            questions = self.Question.objects.using(self.using).bulk_create([
+                self.Question(
+                    question_text=record['question_text'],
+                    question_type=record['question_type'],
+                    exam_board_id=self.board_id(record['board']),
+                    exam_year=record['year'],
+                    marks=record['marks'],
+                    media=record['media'],
+                    **{name: record[name] for name in self.extra_fields},
+                )
+                for record in records
+            ])
+
+            options = [
+                self.QuestionOption(question_id=question.id, option_text=text, is_correct=is_correct)
+                for question, record in zip(questions, records)
+                for text, is_correct in record['options']
+            ]
+            self.QuestionOption.objects.using(self.using).bulk_create(options, batch_size=self.batch_size)
+
+            Through.objects.using(self.using).bulk_create([
+                Through(exam_id=exam.id, question_id=question.id) for question in questions
+            ])
+            self.record_facets(exam.subject_id, [
+                (question.exam_board_id, question.exam_year, question.question_type) for question in questions
+            ])
+            self.touch_pool(exam)
+        return len(questions), len(options)
+
+    def import_file(self, file_path, stats=None):
+        stats = stats or ImportStats()
+        file_import = self.prepare_file(file_path, stats)
+        if file_import is None:
+            return stats
+        try:
+            for batch in chunked(read_normalized(file_path), self.batch_size):
+                file_import.write(batch, stats)
+        except (ValueError, KeyError) as e:
+            # Batches already written stay committed; the checksum is not
+            # recorded, so the next sync picks the file up again.
+            self.log(f"Error loading {os.path.basename(file_path)} after {file_import.loaded} questions: {e}")
+            return stats
+        file_import.finish(stats)
+        return stats
+
+    def import_directory(self, directory=DEFAULT_BANK_DIR, workers=1):
+        stats = ImportStats()
+        if not os.path.exists(directory):
+            self.log(f"Folder {directory} not found.")
+            return stats
+
+        paths = [
+            os.path.join(directory, filename)
+            for filename in sorted(os.listdir(directory))
+            if filename.endswith('.json')
+        ]
+        if workers > 1:
+            from .parallel import import_parallel
+            import_parallel(self, paths, workers, stats)
+        else:
+            for path in paths:
+                self.import_file(path, stats)
+
+        self.log(f"Imported {stats}")
+        return stats
@@ -0,0 +1,66 @@
+# exams_management/question_bank/parallel.py
+import os
+import multiprocessing
+from .importer import chunked, read_normalized
+
+BATCH, FAILED, DONE = 'batch', 'failed', 'done'
+
+_queue = None
+
+
+def _init_worker(queue):
+    global _queue
+    _queue = queue
+
+
+def _parse_file(file_path, batch_size):
+    """
+    Worker side: parse, normalize and hash one subject file, handing each
+    finished batch to the writer. Workers never touch the database.
+    """
+    try:
+        for batch in chunked(read_normalized(file_path), batch_size):
+            _queue.put((BATCH, file_path, batch))
+    except Exception as e:
+        _queue.put((FAILED, file_path, str(e)))
+    finally:
+        _queue.put((DONE, file_path, None))
+
+
+def import_parallel(importer, paths, workers, stats):
+    """
+    Parse ``paths`` in a pool of ``workers`` processes while this process acts
+    as the single writer, so SQLite only ever sees one connection inserting.
+
+    The hand-off queue is bounded, which keeps memory flat when parsing
+    outruns the writer.
+    """
+    jobs = {}
+    for path in paths:
+        file_import = importer.prepare_file(path, stats)
+        if file_import is not None:
+            jobs[path] = file_import
+    if not jobs:
+        return stats
+
+    ctx = multiprocessing.get_context()
+    queue = ctx.Queue(maxsize=workers * 4)
+    failed = set()
+    with ctx.Pool(min(workers, len(jobs)), initializer=_init_worker, initargs=(queue,)) as pool:
+        pending = [pool.apply_async(_parse_file, (path, importer.batch_size)) for path in jobs]
+        remaining = len(jobs)
+        while remaining:
+            kind, path, payload = queue.get()
+            file_import = jobs[path]
+            if kind == BATCH:
+                file_import.write(payload, stats)
+            elif kind == FAILED:
+                failed.add(path)
+                importer.log(f"Error loading {os.path.basename(path)} after {file_import.loaded} questions: {payload}")
+            else:
+                remaining -= 1
+                if path not in failed:
+                    file_import.finish(stats)
+        for result in pending:
+            result.get()
+    return stats
@@ -0,0 +1,109 @@
+# exams_management/question_bank/reader.py
+import json
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\r\n'
+
+
+class _JSONStream:
+    """A growable window over a text file that decodes one JSON value at a time."""
+
+    def __init__(self, file, chunk_size=CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+        # Drop what has already been consumed so the window never grows past
+        # one value plus one chunk.
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        data = self.file.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer += data
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number that touches the end of the window may still be growing.
+            if end == len(self.buffer) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def iter_array(self):
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' at offset {self.pos - 1}, found {char!r}")
+
+
+def iter_questions(file_path, key='questions', chunk_size=CHUNK_SIZE):
+    """
+    Yield the records of ``{"questions": [...]}`` one at a time.
+
+    Only the record being decoded and one read chunk are held in memory, so
+    peak usage does not depend on the size of the file. Other top-level keys
+    (``total_questions`` and friends) are decoded and discarded. A bare
+    top-level array is accepted as well.
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        stream = _JSONStream(file, chunk_size)
+        if stream.peek() == '[':
+            yield from stream.iter_array()
+            return
+
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            name = stream.decode()
+            stream.expect(':')
+            if name == key:
+                yield from stream.iter_array()
+            else:
+                stream.decode()
+            char = stream.peek()
+            stream.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError(f"Expected ',' or '}}' at offset {stream.pos - 1}, found {char!r}")
@@ -0,0 +1,90 @@
+# exams_management/review.py
+from functools import partial
+from django.db import transaction
+from django.utils import timezone
+from . import answer_keys, events
+from .paper import attempt_questions
+from .scoring import score_for
+
+
+def build_reviews(attempts):
+    """
+    ``{attempt_id: review}`` for ``attempts`` (with ``exam`` loaded) in one
+    query however many there are: questions and options come from the
+    paper snapshot, in the order the student saw them, and the marking from
+    the answer-key cache. A review is
+    plain JSON: every question the student was given, its options with the
+    key, what they picked and the marks awarded.
+    """
+    from .models import ExamAnswer
+    attempt_ids = [attempt.id for attempt in attempts]
+    selected = {
+        (attempt_id, question_id): option_id
+        for attempt_id, question_id, option_id in ExamAnswer.objects.filter(attempt_id__in=attempt_ids)
+        .values_list('attempt_id', 'question_id', 'selected_option_id')
+    }
+    records = {}
+    for attempt in attempts:
+        records[attempt.id] = attempt_questions(attempt.exam, attempt.id, attempt.question_ids)
+    keys = answer_keys.keys_for({record.id for picked in records.values() for record in picked})
+
+    reviews = {}
+    for attempt_id in attempt_ids:
+        items, correct_answers = [], 0
+        for record in records[attempt_id]:
+            correct_ids = keys[record.id][1]
+            choice = selected.get((attempt_id, record.id))
+            correct = choice in correct_ids
+            correct_answers += correct
+            items.append({
+                'id': record.id,
+                'html': record.question_html,
+                'marks': record.marks,
+                'awarded': record.marks if correct else 0,
+                'selected': choice,
+                'correct': correct,
+                'options': [
+                    {'id': option.id, 'text': option.option_text, 'is_correct': option.id in correct_ids}
+                    for option in record.options
+                ],
+            })
+        reviews[attempt_id] = {
+            'total_questions': len(items),
+            'correct_answers': correct_answers,
+            'questions': items,
+        }
+    return reviews
+
+
+def finalize_attempts(attempts, now=None, settle=True):
+    """
+    Score, review and stamp ``attempts`` (with ``exam`` loaded) as submitted
+    in a handful of queries for the whole lot. Their journaled autosaves are
+    written first unless the caller has already done so (``settle=False``).
+    """
+    from .models import ExamResult
+    from . import heartbeat, journal
+    from .proctor import board
+    if not attempts:
+        return attempts
+    if settle:
+        journal.settle(attempts)  # scoring must see every journaled autosave
+    now = now or timezone.now()
+    reviews = build_reviews(attempts)
+    for attempt in attempts:
+        attempt.review = reviews[attempt.id]
+        attempt.score = score_for(attempt.exam, attempt.review['correct_answers'], attempt.review['total_questions'])
+        attempt.highest_score = attempt.exam.total_marks
+        attempt.submitted_at = now
+        heartbeat.registry.forget(attempt.id)
+    ExamResult.objects.bulk_update(attempts, ['review', 'score', 'highest_score', 'submitted_at'], batch_size=200)
+    board.finished([attempt.id for attempt in attempts])
+    transaction.on_commit(partial(heartbeat.registry.finished, [attempt.id for attempt in attempts]))
+    transaction.on_commit(partial(journal.finished, [attempt.id for attempt in attempts]))
+    transaction.on_commit(partial(events.results_published, attempts))
+    return attempts
+
+
+def finalize_attempt(attempt, now=None, settle=True):
+    """Score ``attempt``, mark it submitted and store its review record."""
+    return finalize_attempts([attempt], now, settle)[0]
@@ -0,0 +1,185 @@
+# exams_management/sampling.py
+import random
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import F
+
+POOL_TIMEOUT = 60 * 60 * 6
+
+
+def pool_key(exam):
+    return f"exam-pool:{exam.id}:{exam.pool_version}"
+
+
+def strata_key(exam):
+    return f"{pool_key(exam)}:strata"
+
+
+def question_pool(exam):
+    """
+    ``(question_id, duplicate_cluster)`` pairs for every question on the
+    paper, read once per pool version and then served from the cache. Only
+    primary keys come back, so a 50,000 question pool stays a cheap tuple.
+    """
+    key = pool_key(exam)
+    pool = cache.get(key)
+    if pool is None:
+        pool = tuple(exam.questions.order_by('id').values_list('id', 'duplicate_cluster'))
+        cache.set(key, pool, POOL_TIMEOUT)
+    return pool
+
+
+def forget_pool(exam):
+    cache.delete_many([pool_key(exam), strata_key(exam)])
+
+
+def bump_pool_version(exam_id, using='default', Exam=None):
+    """Invalidate the cached pool after questions were attached or detached in bulk."""
+    if Exam is None:
+        from .models import Exam
+    Exam.objects.using(using).filter(id=exam_id).update(pool_version=F('pool_version') + 1)
+
+
+def bump_pools_serving(question_ids, using='default'):
+    """Invalidate the pool (and so the paper) of every exam that holds any of ``question_ids``."""
+    from .models import Exam
+    Exam.objects.using(using).filter(questions__in=list(question_ids)).update(pool_version=F('pool_version') + 1)
+
+
+def sample_distinct(pool, count, rng=random):
+    """
+    Pick ``count`` question ids from ``(question_id, cluster)`` pairs with at
+    most one per near-duplicate cluster, or None when there are not enough
+    distinct questions. A small oversample is nearly always enough; the full
+    shuffle is only the fallback.
+    """
+    for draw in (min(len(pool), count * 2), len(pool)):
+        picked, seen = [], set()
+        for question_id, cluster in rng.sample(pool, draw):
+            if cluster is not None:
+                if cluster in seen:
+                    continue
+                seen.add(cluster)
+            picked.append(question_id)
+            if len(picked) == count:
+                return picked
+    return None
+
+
+def sample_question_ids(exam, count, rng=random):
+    """Random question ids for a new attempt, or None if the pool is too small."""
+    pool = question_pool(exam)
+    if count > len(pool):
+        return None
+    if exam.dedupe_questions:
+        return sample_distinct(pool, count, rng)
+    return [question_id for question_id, _ in rng.sample(pool, count)]
+
+
+def _rule_questions(exam, rule):
+    questions = exam.questions.all()
+    if rule.exam_board_id:
+        questions = questions.filter(exam_board_id=rule.exam_board_id)
+    if rule.year_from:
+        questions = questions.filter(exam_year__gte=rule.year_from)
+    if rule.year_to:
+        questions = questions.filter(exam_year__lte=rule.year_to)
+    if rule.question_type:
+        questions = questions.filter(question_type=rule.question_type)
+    return questions
+
+
+def stratum(exam, rule):
+    """
+    ``(question_id, exam_year, duplicate_cluster)`` for every question a rule
+    matches, read once per pool version like ``question_pool``. The key
+    carries the rule's filters, so an edited rule never reads a stale list.
+    """
+    key = strata_key(exam)
+    strata = cache.get(key) or {}
+    signature = (rule.exam_board_id, rule.year_from, rule.year_to, rule.question_type)
+    rows = strata.get(signature)
+    if rows is None:
+        rows = strata[signature] = tuple(_rule_questions(exam, rule).order_by('id')
+                                         .values_list('id', 'exam_year', 'duplicate_cluster'))
+        cache.set(key, strata, POOL_TIMEOUT)
+    return rows
+
+
+def _take(rows, count, taken, clusters, max_per_year=None):
+    """Greedily accept ``rows`` (already in random order) until ``count`` are picked."""
+    picked, per_year, used = [], {}, set()
+    for question_id, year, cluster in rows:
+        if question_id in taken:
+            continue
+        if cluster is not None and (cluster in clusters or cluster in used):
+            continue
+        if max_per_year and per_year.get(year, 0) >= max_per_year:
+            continue
+        picked.append(question_id)
+        per_year[year] = per_year.get(year, 0) + 1
+        if cluster is not None:
+            used.add(cluster)
+        if len(picked) == count:
+            return picked, used
+    return None, used
+
+
+def select_by_blueprint(exam, rules, total=0, rng=random):
+    """
+    Question ids satisfying every rule of the blueprint, topped up at random
+    to ``total``. Each stratum comes from the cache, so drawing for a whole
+    grade costs no queries after the first student; a sample a little
+    larger than the quota is usually enough, and only when the caps reject
+    too many is the whole stratum shuffled. Returns None when a quota
+    cannot be met, or when the quotas alone exceed ``total``.
+    """
+    from .models import ExamBlueprintRule
+    remainder = total - sum(rule.count for rule in rules)
+    if total and remainder < 0:
+        return None
+    if remainder > 0:
+        rules = [*rules, ExamBlueprintRule(count=remainder)]
+    selected, taken, clusters = [], set(), set()
+    for rule in rules:
+        if not rule.count:
+            continue
+        rows = stratum(exam, rule)
+        want = rule.count + len(taken)
+        picked = None
+        for draw in (min(len(rows), want * 2 + 10), len(rows)):
+            picked, used = _take(rng.sample(rows, draw), rule.count, taken,
+                                 clusters if exam.dedupe_questions else (), rule.max_per_year)
+            if picked is not None or draw == len(rows):
+                break
+        if picked is None:
+            return None
+        selected.extend(picked)
+        taken.update(picked)
+        if exam.dedupe_questions:
+            clusters.update(used)
+    return selected
+
+
+def attempts_serving(question_ids, using='default', ExamResult=None):
+    """
+    ``(attempt_id, question_id)`` for every attempt that was given one of
+    ``question_ids``. Attempts keep their questions as a packed JSON array,
+    so SQLite's json_each unpacks them; only re-scoring and retiring bank
+    questions ask this.
+    """
+    if ExamResult is None:
+        from .models import ExamResult
+    question_ids = list(question_ids)
+    table = ExamResult._meta.db_table
+    pairs = []
+    with connections[using].cursor() as cursor:
+        for start in range(0, len(question_ids), 500):
+            chunk = question_ids[start:start + 500]
+            cursor.execute(
+                f"SELECT a.id, q.value FROM {table} a, json_each(a.question_ids) q "
+                f"WHERE q.value IN ({', '.join(['%s'] * len(chunk))})",
+                chunk,
+            )
+            pairs.extend(cursor.fetchall())
+    return pairs
@@ -0,0 +1,97 @@
+# exams_management/scoring.py
+from django.db import transaction
+from django.db.models import Count
+from . import answer_keys
+from .sampling import attempts_serving
+
+RESCORE_BATCH = 500
+
+
+def score_for(exam, correct_answers, total_questions=0):
+    """Marks out of ``exam.total_marks`` for ``correct_answers`` right answers."""
+    total_marks = exam.total_marks or 0
+    limit = exam.student_question_limit or total_questions or 1
+    return round(correct_answers * total_marks / limit, 2)
+
+
+def correct_counts(attempt_ids):
+    """``{attempt_id: correct answers}`` from one grouped COUNT over the answer rows."""
+    from .models import ExamAnswer
+    return dict(
+        ExamAnswer.objects.filter(attempt_id__in=attempt_ids, selected_option__is_correct=True)
+        .values('attempt_id').annotate(correct=Count('id')).values_list('attempt_id', 'correct')
+    )
+
+
+def apply_key(review, keys):
+    """
+    Re-mark a frozen review against ``keys`` (``{question_id: correct option
+    ids}``) in place; questions missing from ``keys`` keep their old marking.
+    """
+    correct_answers = 0
+    for item in review['questions']:
+        correct_ids = keys.get(item['id'])
+        if correct_ids is not None:
+            for option in item['options']:
+                option['is_correct'] = option['id'] in correct_ids
+            item['correct'] = item['selected'] in correct_ids
+            item['awarded'] = item['marks'] if item['correct'] else 0
+        correct_answers += item['correct']
+    review['correct_answers'] = correct_answers
+    return review
+
+
+def current_keys(question_ids):
+    """``{question_id: correct option ids}`` read fresh, refreshing the answer-key cache."""
+    answer_keys.forget(question_ids)
+    return {question_id: correct for question_id, (_, correct) in answer_keys.keys_for(question_ids).items()}
+
+
+def rescore(attempts, question_ids=None):
+    """
+    Recompute ``score`` (and the review marking) for submitted ``attempts``,
+    a queryset of ExamResult. Works in batches: per batch one grouped count,
+    one key query and one bulk update, whatever the number of attempts.
+    Returns how many attempts were re-scored.
+    """
+    from .models import ExamResult
+    attempts = attempts.filter(submitted_at__isnull=False).select_related('exam').order_by('id')
+    rescored = 0
+    last_id = 0
+    while True:
+        batch = list(attempts.filter(id__gt=last_id)[:RESCORE_BATCH])
+        if not batch:
+            return rescored
+        last_id = batch[-1].id
+        counts = correct_counts([attempt.id for attempt in batch])
+
+        if question_ids is not None:
+            keys = current_keys(question_ids)
+        else:
+            served = {item['id'] for attempt in batch if attempt.review for item in attempt.review['questions']}
+            keys = current_keys(served)
+
+        for attempt in batch:
+            total_questions = 0
+            if attempt.review:
+                apply_key(attempt.review, keys)
+                total_questions = attempt.review['total_questions']
+            attempt.score = score_for(attempt.exam, counts.get(attempt.id, 0), total_questions)
+        with transaction.atomic():
+            ExamResult.objects.bulk_update(batch, ['score', 'review'])
+        rescored += len(batch)
+        if len(batch) < RESCORE_BATCH:
+            return rescored
+
+
+def rescore_exam(exam_id):
+    """Re-score every submitted attempt of one exam, e.g. after fixing its key."""
+    from .models import ExamResult
+    return rescore(ExamResult.objects.filter(exam_id=exam_id))
+
+
+def rescore_question(question_id):
+    """Re-score every submitted attempt that was given ``question_id``."""
+    from .models import ExamResult
+    served = [attempt_id for attempt_id, _ in attempts_serving([question_id])]
+    return rescore(ExamResult.objects.filter(id__in=served), question_ids=[question_id])
@@ -0,0 +1,114 @@
+# exams_management/search.py
+import re
+from django.db import connection
+from .models import Question
+
+FTS_TABLE = 'exams_management_question_fts'
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_fts_available = None
+
+
+def fts_available():
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = FTS_TABLE in connection.introspection.table_names()
+    return _fts_available
+
+
+def fts_query(text):
+    """
+    Turn free text into a safe FTS5 expression: every word must match and the
+    last one is treated as a prefix, so "photosynth" finds "photosynthesis".
+    """
+    tokens = TOKEN_RE.findall(text)
+    if not tokens:
+        return ''
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+class QuestionSearch:
+    """
+    Ranked question search that Paginator can slice. Only one page of ids is
+    fetched from the index at a time, then hydrated in a single query.
+    """
+
+    def __init__(self, text, subject=None, exam_board=None, exam_year=None):
+        self.text = text
+        self.match = fts_query(text)
+        self.subject = subject
+        self.exam_board = exam_board
+        self.exam_year = exam_year
+        self._count = None
+
+    def _where(self):
+        clauses, params = [f"{FTS_TABLE} MATCH %s"], [self.match]
+        if self.subject:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM exams_management_exam_questions eq "
+                "JOIN exams_management_exam e ON e.id = eq.exam_id "
+                "WHERE eq.question_id = q.id AND e.subject_id = %s)"
+            )
+            params.append(self.subject)
+        if self.exam_board:
+            clauses.append("q.exam_board_id = %s")
+            params.append(self.exam_board)
+        if self.exam_year:
+            clauses.append("q.exam_year = %s")
+            params.append(self.exam_year)
+        return ' AND '.join(clauses), params
+
+    def _fallback(self):
+        """Substring search for databases without the FTS5 index."""
+        questions = Question.objects.all()
+        for token in TOKEN_RE.findall(self.text):
+            questions = questions.filter(question_plain__icontains=token)
+        if self.subject:
+            questions = questions.filter(exam__subject_id=self.subject).distinct()
+        if self.exam_board:
+            questions = questions.filter(exam_board_id=self.exam_board)
+        if self.exam_year:
+            questions = questions.filter(exam_year=self.exam_year)
+        return questions.select_related('exam_board').order_by('id')
+
+    def count(self):
+        if self._count is None:
+            if not self.match:
+                self._count = 0
+            elif not fts_available():
+                self._count = self._fallback().count()
+            else:
+                where, params = self._where()
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT COUNT(*) FROM {FTS_TABLE} JOIN exams_management_question q ON q.id = {FTS_TABLE}.rowid "
+                        f"WHERE {where}",
+                        params,
+                    )
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.match:
+            return []
+        if not fts_available():
+            return list(self._fallback()[index])
+        start = index.start or 0
+        limit = (index.stop - start) if index.stop is not None else -1
+        where, params = self._where()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT q.id FROM {FTS_TABLE} JOIN exams_management_question q ON q.id = {FTS_TABLE}.rowid "
+                f"WHERE {where} ORDER BY bm25({FTS_TABLE}) LIMIT %s OFFSET %s",
+                [*params, limit, start],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        questions = Question.objects.select_related('exam_board').in_bulk(ids)
+        return [questions[pk] for pk in ids if pk in questions]
@@ -0,0 +1,152 @@
+# exams_management/similarity.py
+import re
+from collections import defaultdict
+from hashlib import blake2b
+from django.db import connections, transaction
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# 32 slots per sketch; each of the 16 bands takes two stem slots and the
+# matching two option slots. Pairs at 0.8 Jaccard on both become candidates
+# almost always, pairs at 0.5 about two times in three (and are then rejected).
+NUM_SLOTS = 32
+BAND_ROWS = 2
+DEFAULT_THRESHOLD = 0.8
+EMPTY = 1 << 64
+
+
+def shingles(*texts, size=2):
+    """Word n-grams of ``texts``, lower-cased and punctuation-free."""
+    shingle_set = set()
+    for text in texts:
+        tokens = TOKEN_RE.findall((text or '').lower())
+        if len(tokens) < size:
+            shingle_set.update(tokens)
+        for i in range(len(tokens) - size + 1):
+            shingle_set.add(' '.join(tokens[i:i + size]))
+    return shingle_set
+
+
+def minhash(shingle_set):
+    """
+    One-permutation MinHash: every shingle is hashed once and the minimum is
+    kept per slot, instead of hashing each shingle once per permutation.
+    Empty slots borrow from the next filled slot so short texts still
+    compare fairly.
+    """
+    slots = [EMPTY] * NUM_SLOTS
+    for shingle in shingle_set:
+        h = int.from_bytes(blake2b(shingle.encode(), digest_size=8).digest(), 'little')
+        slot, value = h % NUM_SLOTS, h // NUM_SLOTS
+        if value < slots[slot]:
+            slots[slot] = value
+    if not shingle_set:
+        return tuple(slots)
+    for i in range(NUM_SLOTS):
+        offset = 1
+        while slots[i] == EMPTY:
+            borrowed = slots[(i + offset) % NUM_SLOTS]
+            if borrowed != EMPTY:
+                slots[i] = borrowed + offset
+            offset += 1
+    return tuple(slots)
+
+
+def signature(question_text, options=()):
+    """
+    Stem and option sketches side by side. They are compared separately: a
+    shared instruction ("Choose the appropriate stress pattern...") over
+    different options is not a duplicate, nor are the same options under a
+    different stem.
+    """
+    return minhash(shingles(question_text)) + minhash(shingles(*options))
+
+
+def _estimate(part_a, part_b):
+    if part_a[0] == EMPTY and part_b[0] == EMPTY:
+        return 1.0
+    return sum(a == b for a, b in zip(part_a, part_b)) / NUM_SLOTS
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the stems or the options, whichever is lower."""
+    return min(_estimate(sig_a[:NUM_SLOTS], sig_b[:NUM_SLOTS]),
+               _estimate(sig_a[NUM_SLOTS:], sig_b[NUM_SLOTS:]))
+
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        if parent != item:
+            parent = self.parent[item] = self.find(parent)
+        return parent
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # Keep the smallest id as the root so cluster ids are stable.
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def find_clusters(signatures, threshold=DEFAULT_THRESHOLD):
+    """
+    Group near-duplicates from ``{question_id: signature}``. Locality-sensitive
+    banding only compares questions that share a whole band, so the work
+    grows with the number of questions rather than the number of pairs.
+
+    Returns ``{question_id: cluster_id}`` for questions that have at least one
+    near-duplicate; the cluster id is the smallest question id in it.
+    """
+    buckets = defaultdict(list)
+    for question_id, sig in signatures.items():
+        if sig[0] == EMPTY:
+            continue
+        for band in range(0, NUM_SLOTS, BAND_ROWS):
+            key = sig[band:band + BAND_ROWS] + sig[NUM_SLOTS + band:NUM_SLOTS + band + BAND_ROWS]
+            buckets[(band, key)].append(question_id)
+
+    clusters = _DisjointSet()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if clusters.find(a) != clusters.find(b) and similarity(signatures[a], signatures[b]) >= threshold:
+                    clusters.union(a, b)
+
+    roots = {question_id: clusters.find(question_id) for question_id in clusters.parent}
+    sizes = defaultdict(int)
+    for root in roots.values():
+        sizes[root] += 1
+    return {question_id: root for question_id, root in roots.items() if sizes[root] > 1}
+
+
+def cluster_questions(Question, QuestionOption, threshold=DEFAULT_THRESHOLD, using='default'):
+    """
+    Recompute ``Question.duplicate_cluster`` across the whole bank. Returns
+    ``(clustered_questions, cluster_count)``.
+    """
+    options = defaultdict(list)
+    for question_id, option_text in (QuestionOption.objects.using(using)
+                                     .order_by('question_id', 'id')
+                                     .values_list('question_id', 'option_text').iterator(chunk_size=5000)):
+        options[question_id].append(option_text)
+
+    signatures = {
+        question_id: signature(plain or text, options.pop(question_id, ()))
+        for question_id, text, plain in (Question.objects.using(using)
+                                         .values_list('id', 'question_text', 'question_plain')
+                                         .iterator(chunk_size=5000))
+    }
+    assignments = find_clusters(signatures, threshold)
+
+    table = connections[using].ops.quote_name(Question._meta.db_table)
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(f"UPDATE {table} SET duplicate_cluster = NULL WHERE duplicate_cluster IS NOT NULL")
+        cursor.executemany(f"UPDATE {table} SET duplicate_cluster = %s WHERE id = %s",
+                           [(cluster, question_id) for question_id, cluster in assignments.items()])
+    return len(assignments), len(set(assignments.values()))
+
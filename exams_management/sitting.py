@@ -0,0 +1,73 @@
+# exams_management/sitting.py
+from django.db import transaction
+from django.utils import timezone
+from .paper import get_paper
+from .sampling import sample_question_ids, select_by_blueprint
+
+BATCH_SIZE = 500
+
+
+class SittingError(ValueError):
+    """The paper cannot give every student of the sitting a full set of questions."""
+
+
+def draw_question_ids(exam, rules):
+    """One student's questions: by blueprint when the exam has rules, else at random."""
+    if rules:
+        return select_by_blueprint(exam, rules, total=exam.student_question_limit)
+    return sample_question_ids(exam, exam.student_question_limit)
+
+
+def prepare_sitting(exam):
+    """
+    Create an unstarted attempt, with its questions already drawn, for every
+    student of the exam's grade who has none yet. Each batch of attempts is
+    one bulk insert ahead of the window, so opening the exam only stamps
+    ``start_time`` (see ``start_attempt``). The whole sitting is one
+    transaction: if the paper runs out part-way, SittingError leaves no
+    attempts behind. Returns how many attempts were created.
+    """
+    from core.models import StudentProfile
+    from .models import ExamResult
+    rules = list(exam.blueprint_rules.all())
+    student_ids = list(
+        StudentProfile.objects.filter(grade_level_id=exam.grade_level_id)
+        .exclude(user__examresult__exam=exam).order_by('user_id').values_list('user_id', flat=True)
+    )
+    get_paper(exam)
+
+    prepared = 0
+    with transaction.atomic():
+        for start in range(0, len(student_ids), BATCH_SIZE):
+            batch = student_ids[start:start + BATCH_SIZE]
+            drawn = []
+            for student_id in batch:
+                question_ids = draw_question_ids(exam, rules)
+                if question_ids is None:
+                    raise SittingError("Not enough questions in the paper for every student.")
+                drawn.append(question_ids)
+            attempts = ExamResult.objects.bulk_create([
+                ExamResult(exam=exam, student_id=student_id, question_ids=question_ids)
+                for student_id, question_ids in zip(batch, drawn)
+            ])
+            prepared += len(attempts)
+    return prepared
+
+
+def start_attempt(attempt, now=None):
+    """
+    Stamp a prepared attempt as started. A single conditional UPDATE, so two
+    tabs opening it at once agree on one start time. Returns False if
+    another request started it first.
+    """
+    from .models import ExamResult
+    now = now or timezone.now()
+    deadline = now + attempt.exam.duration
+    started = ExamResult.objects.filter(id=attempt.id, start_time__isnull=True).update(
+        start_time=now, deadline=deadline, last_activity=now,
+    )
+    if started:
+        attempt.start_time, attempt.deadline, attempt.last_activity = now, deadline, now
+    else:
+        attempt.refresh_from_db(fields=['start_time', 'deadline'])
+    return bool(started)
@@ -0,0 +1,157 @@
+# exams_management/sse.py
+import asyncio
+import json
+import logging
+import threading
+import time
+from urllib.parse import parse_qs, urlencode, urlsplit
+from django.conf import settings
+from django.core import signing
+from django.http.request import split_domain_port
+from . import events, heartbeat, proctor
+
+logger = logging.getLogger(__name__)
+
+CLOCK_INTERVAL = 15
+QUEUE_SIZE = 64
+HEADER_LIMIT = 8192
+RETRY_MS = 5000
+
+_thread = None
+_port = None
+
+
+def encode(record):
+    event_id, _, event, data = record
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def clock():
+    """Authoritative server time, also the keep-alive that exposes dead connections."""
+    return f"event: clock\ndata: {json.dumps({'now': int(time.time() * 1000)})}\n\n".encode()
+
+
+def respond(writer, status):
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n"
+                 "Access-Control-Allow-Origin: *\r\n\r\n".encode())
+
+
+async def read_request(reader):
+    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=10)
+    request_line, *lines = head.decode('latin-1').split('\r\n')
+    method, target, _ = request_line.split(' ', 2)
+    headers = {}
+    for line in lines:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return method, target, headers
+
+
+async def handle(reader, writer):
+    """
+    One EventSource connection. It costs a coroutine and a small queue, not
+    a thread, so thousands of idle students fit next to Waitress' workers.
+    """
+    try:
+        method, target, headers = await read_request(reader)
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ValueError):
+        writer.close()
+        return
+    url = urlsplit(target)
+    query = parse_qs(url.query)
+    if method != 'GET' or url.path != '/events':
+        respond(writer, '404 Not Found')
+        writer.close()
+        return
+    try:
+        channels, attempt_id = events.read_token(query.get('token', [''])[0])
+    except signing.BadSignature:
+        respond(writer, '403 Forbidden')
+        writer.close()
+        return
+    resume = headers.get('last-event-id')
+    try:
+        last_id = int(resume) if resume else None
+    except ValueError:
+        last_id = None
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(QUEUE_SIZE)
+
+    def offer(record):
+        if queue.full():
+            queue.get_nowait()  # a stalled client loses its oldest event, not the stream
+        queue.put_nowait(record)
+
+    def deliver(record):
+        loop.call_soon_threadsafe(offer, record)
+
+    if last_id is None:
+        last_id = events.bus.latest()  # a new stream starts from now; only reconnects replay
+    events.bus.subscribe(channels, deliver)
+    if attempt_id is not None:
+        proctor.board.streaming(attempt_id, True)
+    try:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Connection: keep-alive\r\nAccess-Control-Allow-Origin: *\r\n\r\n")
+        writer.write(f"retry: {RETRY_MS}\n\n".encode() + clock())
+        for record in events.bus.since(last_id, channels):
+            writer.write(encode(record))
+            last_id = record[0]
+        await writer.drain()
+        while True:
+            if attempt_id is not None and heartbeat.registry.enabled:
+                heartbeat.registry.beat(attempt_id)  # an open stream stands in for ping
+            try:
+                record = await asyncio.wait_for(queue.get(), timeout=CLOCK_INTERVAL)
+            except asyncio.TimeoutError:
+                writer.write(clock())
+            else:
+                if record[0] <= last_id:
+                    continue  # already replayed
+                writer.write(encode(record))
+                last_id = record[0]
+            await writer.drain()
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        events.bus.unsubscribe(channels, deliver)
+        if attempt_id is not None:
+            proctor.board.streaming(attempt_id, False)
+        writer.close()
+
+
+async def serve(host, port, ready):
+    server = await asyncio.start_server(handle, host, port, limit=HEADER_LIMIT, backlog=1024)
+    ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+def start(host='0.0.0.0', port=None):
+    """Serve /events on its own asyncio thread; called by scripts/run_service.py."""
+    global _thread, _port
+    if _thread is not None:
+        return
+    port = port or settings.EXAM_EVENTS_PORT
+    ready = threading.Event()
+
+    def run():
+        try:
+            asyncio.run(serve(host, port, ready))
+        except Exception:
+            logger.exception("Event stream server stopped")
+
+    _thread = threading.Thread(target=run, name='exams-events', daemon=True)
+    _thread.start()
+    if ready.wait(timeout=5):
+        _port = port
+
+
+def stream_url(request, token):
+    """Where the browser should open its EventSource, or None when the sidecar is not running."""
+    if _port is None:
+        return None
+    host, _ = split_domain_port(request.get_host())
+    return f"{request.scheme}://{host}:{_port}/events?{urlencode({'token': token})}"
@@ -0,0 +1,97 @@
+{% load static %}// Exam service worker (served by exams_management.views.service_worker).
+// Keeps the last rendered paper and the static files it needs, so a
+// dropped Wi-Fi link does not take the exam page with it. Answers never go
+// through here: take_exam.html queues them in localStorage itself.
+//
+// Papers are cached per attempt (the page answers with X-Exam-Attempt),
+// never under the bare exam URL: on a shared laptop the next student
+// offline must not be handed someone else's paper. "<exam url>?current"
+// names the attempt the exam URL last rendered, and the page posts
+// 'forget-attempt' once that attempt is submitted. Logging out clears
+// everything via Clear-Site-Data.
+const CACHE = 'exam-pages-v2';
+const PAPER_PREFIX = '/exam/take/';
+const STATIC_PREFIX = '{% get_static_prefix %}';
+
+function paperKey(pathname, attempt) {
+    return `${pathname}?attempt=${encodeURIComponent(attempt)}`;
+}
+
+function currentKey(pathname) {
+    return `${pathname}?current`;
+}
+
+function storePaper(pathname, attempt, response) {
+    return caches.open(CACHE).then(cache => Promise.all([
+        cache.put(paperKey(pathname, attempt), response),
+        cache.put(currentKey(pathname), new Response(attempt)),
+    ]));
+}
+
+function cachedPaper(pathname) {
+    return caches.open(CACHE).then(cache => cache.match(currentKey(pathname))
+        .then(current => current ? current.text() : null)
+        .then(attempt => attempt ? cache.match(paperKey(pathname, attempt)) : null));
+}
+
+function forgetAttempt(attempt) {
+    return caches.open(CACHE).then(cache => cache.keys().then(requests => Promise.all(requests.map(request => {
+        const url = new URL(request.url);
+        if (url.searchParams.get('attempt') === attempt) return cache.delete(request);
+        if (url.search === '?current') {
+            return cache.match(request)
+                .then(current => current.text())
+                .then(id => id === attempt && cache.delete(request));
+        }
+        return null;
+    }))));
+}
+
+self.addEventListener('install', () => self.skipWaiting());
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys.filter(key => key !== CACHE).map(key => caches.delete(key))))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (request.mode === 'navigate' && url.pathname.startsWith(PAPER_PREFIX)) {
+        // Network first: the server's copy has the freshest saved answers.
+        event.respondWith(
+            fetch(request)
+                .then(response => {
+                    const attempt = response.headers.get('X-Exam-Attempt');
+                    if (response.ok && !response.redirected && attempt) {
+                        storePaper(url.pathname, attempt, response.clone());
+                    }
+                    return response;
+                })
+                .catch(() => cachedPaper(url.pathname).then(cached => cached || Response.error()))
+        );
+    } else if (url.pathname.startsWith(STATIC_PREFIX)) {
+        event.respondWith(
+            caches.match(request).then(cached => cached || fetch(request).then(response => {
+                if (response.ok) {
+                    const copy = response.clone();
+                    caches.open(CACHE).then(cache => cache.put(request, copy));
+                }
+                return response;
+            }))
+        );
+    }
+});
+
+self.addEventListener('message', event => {
+    const data = event.data || {};
+    if (data.type === 'forget-attempt') {
+        event.waitUntil(forgetAttempt(String(data.attempt)));
+    }
+});
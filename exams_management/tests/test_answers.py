@@ -0,0 +1,121 @@
+import json
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from exams_management.models import Exam, ExamAnswer, ExamResult, Question, QuestionOption
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class DeltaAutosaveTestCase(TestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name='Autosave Subject')
+        grade = Grade.objects.create(name='Autosave Grade')
+        exam = Exam.objects.create(title='Autosave', subject=subject, grade_level=grade, paper_type='test',
+                                   duration=timezone.timedelta(minutes=30), student_question_limit=30)
+        student = User.objects.create_user(email='autosaver@example.com', password='password', role='student')
+        self.client.force_login(student)
+        self.attempt = ExamResult.objects.create(exam=exam, student=student, start_time=timezone.now())
+        self.options = []
+        for i in range(30):
+            question = Question.objects.create(question_text=f'Autosave {i}', question_type='multiple_choice')
+            self.options.append([QuestionOption.objects.create(question=question, option_text=text)
+                                 for text in ('a', 'b')])
+            self.attempt.question_ids.append(question.id)
+        self.attempt.save()
+        self.url = reverse('exam:submit_exam', args=[self.attempt.id]) + '?autosave=true'
+
+    def save(self, seq, pairs):
+        body = {'seq': seq, 'answers': {str(option.question_id): str(option.id) for option in pairs}}
+        return self.client.post(self.url, json.dumps(body), content_type='application/json')
+
+    def selected(self):
+        return dict(ExamAnswer.objects.filter(attempt=self.attempt).values_list('question_id', 'selected_option_id'))
+
+    def test_batches_upsert_and_stale_ones_are_ignored(self):
+        first, second = self.options[0], self.options[1]
+        self.assertEqual(self.save(1, [first[0], second[0]]).json(), {'status': 'autosaved', 'seq': 1})
+        self.assertEqual(self.save(2, [first[1]]).json()['status'], 'autosaved')
+        # A late retry of batch 1 must not undo the change made in batch 2.
+        self.assertEqual(self.save(1, [first[0], second[0]]).json(), {'status': 'stale', 'seq': 2})
+        self.assertEqual(self.selected(), {first[1].question_id: first[1].id, second[0].question_id: second[0].id})
+
+    def test_cost_does_not_depend_on_paper_length(self):
+        with self.assertNumQueries(7):
+            self.save(1, [self.options[5][0]])
+
+    def test_options_are_checked_against_the_cached_key(self):
+        self.save(1, [self.options[5][0]])
+        with self.assertNumQueries(6):  # one fewer: the key of question 5 is cached
+            self.save(2, [self.options[5][1]])
+
+        # A new option invalidates the cached key at once.
+        added = QuestionOption.objects.create(question_id=self.options[5][0].question_id, option_text='c')
+        self.assertEqual(self.save(3, [added]).json()['status'], 'autosaved')
+
+        # So does a queryset delete, which never calls QuestionOption.delete().
+        removed = self.options[5][1]
+        QuestionOption.objects.filter(id=removed.id).delete()
+        self.assertEqual(self.save(4, [removed]).status_code, 400)
+
+    def test_cascade_deletes_drop_cached_keys(self):
+        option = self.options[6][0]
+        self.save(1, [option])
+        Question.objects.filter(id=option.question_id).delete()
+        self.assertEqual(self.save(2, [option]).status_code, 400)
+
+    def test_option_of_another_question_is_rejected(self):
+        body = {'seq': 1, 'answers': {str(self.options[0][0].question_id): str(self.options[1][0].id)}}
+        response = self.client.post(self.url, json.dumps(body), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.selected(), {})
+
+    def sync(self, *batches):
+        body = {'batches': [{'seq': seq, 'answers': {str(option.question_id): str(option.id) for option in pairs}}
+                            for seq, pairs in batches]}
+        url = reverse('exam:sync_answers', args=[self.attempt.id])
+        return self.client.post(url, json.dumps(body), content_type='application/json')
+
+    def test_offline_queue_syncs_as_one_write(self):
+        first, second = self.options[0], self.options[1]
+        self.save(2, [second[0]])
+        # Batch 1 is older than what the server has; 3 and 4 are merged in order.
+        response = self.sync((4, [first[1]]), (1, [second[1]]), (3, [first[0]]))
+        self.assertEqual(response.json(), {'status': 'synced', 'seq': 4})
+        self.assertEqual(self.selected(), {first[1].question_id: first[1].id, second[0].question_id: second[0].id})
+        self.assertEqual(self.sync((4, [first[0]])).json(), {'status': 'stale', 'seq': 4})
+
+    def test_final_submission_older_than_the_server_keeps_the_newer_answers(self):
+        first = self.options[0]
+        self.sync((5, [first[1]]))
+        body = {'seq': 3, 'answers': {str(first[0].question_id): str(first[0].id)}}
+        self.client.post(reverse('exam:submit_exam', args=[self.attempt.id]), json.dumps(body),
+                         content_type='application/json')
+        self.assertEqual(self.selected(), {first[1].question_id: first[1].id})
+        self.assertEqual(self.sync((6, [first[0]])).status_code, 409)
+        # A second submit (another tab, or after the sweeper) is told where the results are.
+        response = self.client.post(reverse('exam:submit_exam', args=[self.attempt.id]), json.dumps(body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['status'], 'submitted')
+
+    def test_batch_answers_must_be_a_mapping(self):
+        url = reverse('exam:sync_answers', args=[self.attempt.id])
+        body = {'batches': [{'seq': 1, 'answers': [1, 2]}]}
+        response = self.client.post(url, json.dumps(body), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_service_worker_is_served_from_the_exam_scope(self):
+        response = self.client.get(reverse('exam:service_worker'))
+        self.assertEqual(response['Content-Type'], 'application/javascript')
+        self.assertContains(response, "PAPER_PREFIX = '/exam/take/'")
+
+    def test_offline_paper_is_keyed_by_attempt_and_dropped_on_logout(self):
+        response = self.client.get(reverse('exam:take_exam', args=[self.attempt.exam_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Exam-Attempt'], str(self.attempt.id))
+
+        response = self.client.get(reverse('logout'))
+        self.assertEqual(response['Clear-Site-Data'], '"cache", "storage"')
@@ -43,9 +43,9 @@ class AuditFixesTestCase(TestCase):
         self.attempt = ExamResult.objects.create(
             exam=self.exam,
             student=self.user,
-            start_time=timezone.now()
+            start_time=timezone.now(),
+            question_ids=[self.q1.id, self.q2.id]
         )
-        self.attempt.questions.add(self.q1, self.q2)
 
     def test_security_fix_invalid_question(self):
         """Test that submitting an answer for a question NOT in the attempt fails."""
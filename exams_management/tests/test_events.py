@@ -0,0 +1,99 @@
+import socket
+from types import SimpleNamespace
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from exams_management import events, sse
+from exams_management.models import Exam, ExamResult
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class EventBusTestCase(SimpleTestCase):
+    def test_each_stream_gets_an_event_once_and_can_replay(self):
+        bus = events.EventBus()
+        received = []
+        bus.subscribe(['grade:1', 'exam:7'], received.append)
+        first = bus.publish(('grade:1', 'exam:7', 'staff'), 'exam', {'state': 'live'})
+        bus.publish('staff', 'results', {})
+        self.assertEqual([record[0] for record in received], [first])
+
+        bus.unsubscribe(['grade:1', 'exam:7'], received.append)
+        later = bus.publish('exam:7', 'exam', {'state': 'extended'})
+        self.assertEqual(len(received), 1)
+        self.assertEqual([record[0] for record in bus.since(first, ['exam:7'])], [later])
+
+    def test_a_batch_of_results_reaches_the_staff_once(self):
+        staff, students = [], []
+        events.bus.subscribe(['staff'], staff.append)
+        self.addCleanup(events.bus.unsubscribe, ['staff'], staff.append)
+        events.bus.subscribe(['user:1', 'user:2'], students.append)
+        self.addCleanup(events.bus.unsubscribe, ['user:1', 'user:2'], students.append)
+
+        events.results_published([SimpleNamespace(id=pk, exam_id=9, student_id=pk, score=1) for pk in (1, 2)])
+        self.assertEqual([record[3] for record in staff], [{'attempts': [1, 2], 'exams': [9]}])
+        self.assertEqual([record[3]['attempt'] for record in students], [1, 2])
+
+    def test_tokens_cannot_be_forged(self):
+        token = signing.dumps({'c': ['staff'], 'a': None}, salt=events.TOKEN_SALT)
+        self.assertEqual(events.read_token(token), (['staff'], None))
+        with self.assertRaises(signing.BadSignature):
+            events.read_token(token[:-2] + 'xx')
+
+
+class EventStreamTestCase(TestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name='Events Subject')
+        grade = Grade.objects.create(name='Events Grade')
+        self.exam = Exam.objects.create(title='Events', subject=subject, grade_level=grade, paper_type='test',
+                                        duration=timedelta(minutes=30))
+        self.teacher = User.objects.create_user(email='proctor@example.com', password='password', role='teacher')
+
+    def test_extension_moves_open_deadlines_and_is_pushed(self):
+        student = User.objects.create_user(email='extended@example.com', password='password', role='student')
+        attempt = ExamResult.objects.create(exam=self.exam, student=student, start_time=timezone.now())
+        before = attempt.deadline
+        received = []
+        events.bus.subscribe([f'exam:{self.exam.id}'], received.append)
+        self.addCleanup(events.bus.unsubscribe, [f'exam:{self.exam.id}'], received.append)
+
+        self.client.force_login(self.teacher)
+        response = self.client.post(reverse('exam:extend_exam', args=[self.exam.id]), {'minutes': 10})
+        self.assertEqual(response.status_code, 200)
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.deadline - before, timedelta(minutes=10))
+        self.assertEqual(received[-1][2:], ('exam', {'exam': self.exam.id, 'state': 'extended', 'seconds': 600}))
+
+    def test_only_staff_can_extend(self):
+        student = User.objects.create_user(email='greedy@example.com', password='password', role='student')
+        attempt = ExamResult.objects.create(exam=self.exam, student=student, start_time=timezone.now())
+        url = reverse('exam:extend_exam', args=[self.exam.id])
+
+        self.client.force_login(student)
+        self.assertEqual(self.client.post(url, {'minutes': 60}).status_code, 403)
+        self.client.force_login(self.teacher)
+        self.assertEqual(self.client.post(url, {'minutes': 0}).status_code, 400)
+        self.assertEqual(self.client.post(url, {'minutes': 'soon'}).status_code, 400)
+        self.assertEqual(ExamResult.objects.get(id=attempt.id).deadline, attempt.deadline)
+
+    def test_sidecar_streams_clock_and_events(self):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        sse.start('127.0.0.1', port)
+        token = events.make_token(self.teacher)
+        with socket.create_connection(('127.0.0.1', port), timeout=5) as client:
+            client.sendall(f'GET /events?token={token} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+            stream = client.makefile('rb')
+            self.assertEqual(stream.readline(), b'HTTP/1.1 200 OK\r\n')
+            while b'event: clock' not in stream.readline():
+                pass
+            events.exam_changed(self.exam, 'live')
+            while not (line := stream.readline()).startswith(b'event: '):
+                pass
+            self.assertEqual(line, b'event: exam\n')
+            self.assertIn(b'"state": "live"', stream.readline())
@@ -0,0 +1,40 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from exams_management import expiry
+from exams_management.models import Exam, ExamAnswer, ExamResult, Question, QuestionOption
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class ExpirySweeperTestCase(TestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name='Expiry Subject')
+        grade = Grade.objects.create(name='Expiry Grade')
+        self.exam = Exam.objects.create(title='Expiry', subject=subject, grade_level=grade, paper_type='test',
+                                        duration=timedelta(minutes=30), student_question_limit=1, total_marks=10)
+        self.question = Question.objects.create(question_text='Expiry', question_type='multiple_choice')
+        self.right = QuestionOption.objects.create(question=self.question, option_text='a', is_correct=True)
+
+    def attempt(self, email, started):
+        student = User.objects.create_user(email=email, password='password', role='student')
+        return ExamResult.objects.create(exam=self.exam, student=student, start_time=started,
+                                         question_ids=[self.question.id])
+
+    def test_sweep_submits_only_expired_attempts(self):
+        now = timezone.now()
+        abandoned = self.attempt('abandoned@example.com', now - timedelta(hours=2))
+        ExamAnswer.objects.create(attempt=abandoned, question=self.question, selected_option=self.right)
+        sitting = self.attempt('sitting@example.com', now - timedelta(minutes=5))
+        self.assertEqual(abandoned.deadline, abandoned.start_time + self.exam.duration)
+
+        self.assertEqual(expiry.sweep(now), 1)
+        abandoned.refresh_from_db()
+        sitting.refresh_from_db()
+        self.assertEqual(abandoned.submitted_at, now)
+        self.assertEqual(abandoned.score, 10)
+        self.assertEqual(abandoned.review['correct_answers'], 1)
+        self.assertIsNone(sitting.submitted_at)
+        self.assertEqual(expiry.sweep(now), 0)
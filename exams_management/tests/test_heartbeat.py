@@ -0,0 +1,67 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from exams_management.heartbeat import HeartbeatRegistry
+from exams_management import heartbeat
+from exams_management.models import Exam, ExamResult, Question
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class HeartbeatTestCase(TestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name='Heartbeat Subject')
+        grade = Grade.objects.create(name='Heartbeat Grade')
+        self.exam = Exam.objects.create(title='Heartbeat', subject=subject, grade_level=grade, paper_type='test',
+                                        duration=timezone.timedelta(minutes=30), student_question_limit=1)
+        self.exam.questions.add(Question.objects.create(question_text='Heartbeat', question_type='essay'))
+        self.student = User.objects.create_user(email='pinger@example.com', password='password', role='student')
+        self.client.force_login(self.student)
+
+        original = heartbeat.registry
+        heartbeat.registry = HeartbeatRegistry()
+        heartbeat.registry.enable()
+        self.addCleanup(setattr, heartbeat, 'registry', original)
+
+    def test_ping_is_memory_only_until_flushed(self):
+        self.client.get(reverse('exam:take_exam', args=[self.exam.id]))
+        attempt = ExamResult.objects.get(student=self.student)
+        stale = timezone.now() - timedelta(hours=1)
+        ExamResult.objects.filter(id=attempt.id).update(last_activity=stale)
+
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse('exam:ping', args=[attempt.id]))
+        self.assertEqual(response.json(), {'status': 'ok'})
+        self.assertIsNotNone(heartbeat.registry.last_seen(attempt.id))
+
+        self.assertEqual(heartbeat.registry.flush(), 1)
+        attempt.refresh_from_db()
+        self.assertGreater(attempt.last_activity, stale)
+        self.assertEqual(heartbeat.registry.flush(), 0)
+
+    def test_finished_attempts_stop_beating(self):
+        self.client.get(reverse('exam:take_exam', args=[self.exam.id]))
+        attempt = ExamResult.objects.get(student=self.student)
+        url = reverse('exam:ping', args=[attempt.id])
+        self.assertEqual(self.client.post(url).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('exam:submit_exam', args=[attempt.id]), '{"answers": {}}',
+                             content_type='application/json')
+        self.assertIsNone(heartbeat.registry.last_seen(attempt.id))
+        # Gone from the session, and refused by the registry even if another tab still has it.
+        self.assertEqual(self.client.post(url).status_code, 404)
+        session = self.client.session
+        heartbeat.remember_attempt(session, attempt.id)
+        session.save()
+        self.assertEqual(self.client.post(url).status_code, 410)
+
+    def test_ping_rejects_attempts_not_opened_in_this_session(self):
+        other = User.objects.create_user(email='other@example.com', password='password', role='student')
+        attempt = ExamResult.objects.create(exam=self.exam, student=other, start_time=timezone.now())
+        response = self.client.post(reverse('exam:ping', args=[attempt.id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(heartbeat.registry.last_seen(attempt.id))
@@ -0,0 +1,130 @@
+import json
+import tempfile
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from exams_management import journal
+from exams_management.models import Exam, ExamAnswer, ExamResult, Question, QuestionOption
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class AutosaveJournalTestCase(TestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name='Journal Subject')
+        grade = Grade.objects.create(name='Journal Grade')
+        exam = Exam.objects.create(title='Journal', subject=subject, grade_level=grade, paper_type='test',
+                                   duration=timezone.timedelta(minutes=30), student_question_limit=2, total_marks=2)
+        student = User.objects.create_user(email='journaled@example.com', password='password', role='student')
+        self.client.force_login(student)
+        self.attempt = ExamResult.objects.create(exam=exam, student=student, start_time=timezone.now())
+        self.options = []
+        for i in range(2):
+            question = Question.objects.create(question_text=f'Journal {i}', question_type='multiple_choice')
+            self.options.append((QuestionOption.objects.create(question=question, option_text='a', is_correct=True),
+                                 QuestionOption.objects.create(question=question, option_text='b')))
+            self.attempt.question_ids.append(question.id)
+        self.attempt.save()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        original = journal.journal
+        journal.journal = journal.AutosaveJournal(directory.name)
+        journal.journal.enable()
+        self.addCleanup(setattr, journal, 'journal', original)
+        self.url = reverse('exam:submit_exam', args=[self.attempt.id])
+
+    def post(self, body, autosave=True):
+        url = self.url + ('?autosave=true' if autosave else '')
+        return self.client.post(url, json.dumps(body), content_type='application/json').json()
+
+    def answer(self, option):
+        return {str(option.question_id): str(option.id)}
+
+    def test_autosave_is_journaled_then_flushed_in_one_go(self):
+        first, second = self.options
+        self.assertEqual(self.post({'seq': 1, 'answers': self.answer(first[1])})['status'], 'autosaved')
+        self.assertEqual(self.post({'seq': 2, 'answers': self.answer(second[0])})['status'], 'autosaved')
+        self.assertEqual(self.post({'seq': 2, 'answers': self.answer(second[1])})['status'], 'stale')
+        self.assertFalse(ExamAnswer.objects.filter(attempt=self.attempt).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            journal.flush()
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.autosave_seq, 2)
+        self.assertEqual(
+            set(ExamAnswer.objects.filter(attempt=self.attempt).values_list('selected_option_id', flat=True)),
+            {first[1].id, second[0].id},
+        )
+
+    def test_final_submit_sees_journaled_answers(self):
+        first, second = self.options
+        self.post({'seq': 1, 'answers': self.answer(first[0])})
+        response = self.post({'answers': self.answer(second[0])}, autosave=False)
+        self.assertEqual(response['status'], 'success')
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.review['correct_answers'], 2)
+
+        # The journaled line outlives the submit and is dropped by the next flush.
+        with self.captureOnCommitCallbacks(execute=True):
+            journal.flush()
+        self.assertEqual(list(journal.journal.directory.iterdir()), [])
+
+    def test_a_stale_option_is_quarantined_without_losing_the_rest(self):
+        first, second = self.options
+        self.post({'seq': 1, 'answers': self.answer(first[1])})
+        journal.journal.append(self.attempt, {second[0].question_id: 999999}, 2)  # option deleted since
+        self.post({'seq': 3, 'answers': self.answer(second[1])})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            journal.flush()
+        self.assertEqual(
+            set(ExamAnswer.objects.filter(attempt=self.attempt).values_list('selected_option_id', flat=True)),
+            {first[1].id, second[1].id},
+        )
+        self.assertEqual(journal.read_segment(journal.journal.quarantine_path)[0]['seq'], 2)
+        self.assertEqual(list(journal.journal.segments()), [])
+
+        # Nothing is left to hold up the next flush or the final submit.
+        self.post({'seq': 4, 'answers': self.answer(second[0])})
+        self.assertEqual(self.post({'answers': {}}, autosave=False)['status'], 'success')
+        self.assertEqual(
+            set(ExamAnswer.objects.filter(attempt=self.attempt).values_list('selected_option_id', flat=True)),
+            {first[1].id, second[0].id},
+        )
+
+    def test_segments_are_kept_until_the_flush_commits(self):
+        self.post({'seq': 1, 'answers': self.answer(self.options[0][0])})
+        with self.captureOnCommitCallbacks(execute=False):
+            journal.flush()
+        self.assertEqual(len(journal.journal.segments()), 1)
+
+        # After a restart the unflushed batch is still seen by the paper and by scoring.
+        restarted = journal.AutosaveJournal(journal.journal.directory)
+        restarted.enable()
+        self.assertEqual(restarted.overlay(self.attempt.id), ({self.options[0][0].question_id: self.options[0][0].id}, 1))
+
+    def test_a_failed_flush_keeps_the_answers_visible(self):
+        option = self.options[0][0]
+        self.post({'seq': 1, 'answers': self.answer(option)})
+        with mock.patch('exams_management.journal.apply_entries', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                journal.flush()
+        self.assertEqual(journal.overlay(self.attempt.id), ({option.question_id: option.id}, 1))
+
+        self.post({'seq': 2, 'answers': self.answer(self.options[1][0])})
+        with self.captureOnCommitCallbacks(execute=True):
+            journal.flush()
+        self.assertEqual(ExamAnswer.objects.filter(attempt=self.attempt).count(), 2)
+        self.assertEqual(journal.overlay(self.attempt.id), ({}, 0))
+        self.assertEqual(journal.journal.segments(), [])
+
+    def test_submitted_attempts_are_forgotten(self):
+        self.post({'seq': 1, 'answers': self.answer(self.options[0][0])})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post({'answers': {}}, autosave=False)
+        self.assertEqual(journal.overlay(self.attempt.id), ({}, 0))
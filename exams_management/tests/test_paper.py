@@ -0,0 +1,144 @@
+import threading
+import time
+from unittest import mock
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from exams_management.admin import QuestionAdmin
+from exams_management.models import Exam, ExamResult, Question, QuestionOption
+from exams_management.paper import attempt_questions, forget_paper, get_paper
+from exams_management.sampling import forget_pool, question_pool
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class PaperSnapshotTestCase(TestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name='Paper Subject')
+        grade = Grade.objects.create(name='Paper Grade')
+        self.exam = Exam.objects.create(title='Paper', subject=subject, grade_level=grade, paper_type='test',
+                                        duration=timezone.timedelta(minutes=30), student_question_limit=2)
+        self.add_questions(3)
+        self.addCleanup(forget_paper, self.exam.id)
+
+    def add_questions(self, count):
+        for i in range(count):
+            question = Question.objects.create(question_text=f'<p>Snapshot {i}</p>', question_type='multiple_choice')
+            QuestionOption.objects.create(question=question, option_text='right', is_correct=True)
+            QuestionOption.objects.create(question=question, option_text='wrong')
+            self.exam.questions.add(question)
+        self.exam.pool_version += 1
+        self.exam.save()
+
+    def test_snapshot_is_shared_until_the_pool_changes(self):
+        paper = get_paper(self.exam)
+        with self.assertNumQueries(0):
+            self.assertIs(get_paper(self.exam), paper)
+        record = next(iter(paper.questions.values()))
+        self.assertEqual([option.option_text for option in record.options], ['right', 'wrong'])
+        self.assertFalse(hasattr(record.options[0], 'is_correct'))
+
+        self.add_questions(1)
+        self.assertEqual(len(get_paper(self.exam).questions), 4)
+
+    def test_editing_a_question_in_the_admin_rebuilds_the_paper(self):
+        get_paper(self.exam)
+        question = self.exam.questions.order_by('id').first()
+        question.question_text = '<p>Edited</p>'
+        QuestionAdmin(Question, admin.site).save_model(None, question, None, True)
+        self.exam.refresh_from_db()
+        self.addCleanup(forget_pool, self.exam)  # the bumped version outlives the test's exam id
+        self.assertIn('Edited', get_paper(self.exam).questions[question.id].question_html)
+
+    def test_resume_renders_without_per_question_queries(self):
+        student = User.objects.create_user(email='paper@example.com', password='password', role='student')
+        self.client.force_login(student)
+        url = reverse('exam:take_exam', args=[self.exam.id])
+        self.client.get(url)
+
+        def resume_queries():
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url)
+            self.assertContains(response, 'Snapshot')
+            return len(captured)
+
+        before = resume_queries()
+        self.add_questions(20)
+        self.exam.student_question_limit = 20
+        self.exam.save()
+        ExamResult.objects.filter(student=student).delete()
+        self.client.get(url)
+        resume_queries()  # rebuilds the snapshot for the new version
+        self.assertEqual(resume_queries(), before)
+
+    def test_options_are_shuffled_per_attempt_without_storing_the_order(self):
+        question_ids = list(get_paper(self.exam).questions)
+        self.assertEqual(attempt_questions(self.exam, 1, question_ids)[0].options[0].option_text, 'right')
+
+        self.exam.shuffle_options = True
+
+        def order(records):
+            return [(record.id, [option.id for option in record.options]) for record in records]
+
+        orders = {attempt_id: order(attempt_questions(self.exam, attempt_id, question_ids))
+                  for attempt_id in range(1, 9)}
+        with self.assertNumQueries(0):
+            again = attempt_questions(self.exam, 3, question_ids)
+        self.assertEqual(orders[3], order(again))
+        self.assertGreater(len({str([pk for pk, _ in order]) for order in orders.values()}), 1)
+        self.assertGreater(len({str(order) for order in orders.values()}), 1)
+        self.assertEqual([option.option_text for option in get_paper(self.exam).questions[question_ids[0]].options],
+                         ['right', 'wrong'])
+
+    def test_each_question_keeps_its_option_order_when_another_changes(self):
+        self.exam.shuffle_options = True
+        question_ids = list(get_paper(self.exam).questions)
+
+        def options(records):
+            return {record.id: [option.id for option in record.options] for record in records}
+
+        attempts = range(1, 11)
+        before = {attempt_id: options(attempt_questions(self.exam, attempt_id, question_ids)) for attempt_id in attempts}
+        QuestionOption.objects.create(question_id=question_ids[0], option_text='extra')
+        self.exam.pool_version += 1
+        self.exam.save()
+        for attempt_id in attempts:
+            after = options(attempt_questions(self.exam, attempt_id, question_ids))
+            self.assertEqual(len(after[question_ids[0]]), 3)
+            self.assertEqual({pk: after[pk] for pk in question_ids[1:]},
+                             {pk: before[attempt_id][pk] for pk in question_ids[1:]})
+            # A question dropping out of the draw leaves the rest alone too.
+            self.assertEqual(options(attempt_questions(self.exam, attempt_id, question_ids[1:])),
+                             {pk: after[pk] for pk in question_ids[1:]})
+
+    def test_concurrent_misses_build_the_paper_once(self):
+        question_pool(self.exam)  # warm the shared pool cache so the threads need no database
+        builds = []
+
+        def slow_load(question_ids=None, exam=None):
+            builds.append(exam)
+            time.sleep(0.05)
+            return {}
+
+        with mock.patch('exams_management.paper.load_records', slow_load):
+            threads = [threading.Thread(target=get_paper, args=(self.exam,)) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(builds), 1)
+
+    def test_large_pools_only_keep_drawn_questions(self):
+        question_ids = list(self.exam.questions.order_by('id').values_list('id', flat=True))
+        with mock.patch('exams_management.paper.FULL_SNAPSHOT_QUESTIONS', 2):
+            paper = get_paper(self.exam)
+            self.assertEqual(paper.questions, {})
+            self.assertEqual([record.id for record in paper.pick(question_ids[:2])], question_ids[:2])
+            self.assertEqual(set(get_paper(self.exam).questions), set(question_ids[:2]))
+            with self.assertNumQueries(0):
+                paper.pick(question_ids[:2])
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from exams_management import events, proctor
+from exams_management.answers import apply_answers
+from exams_management.heartbeat import registry
+from exams_management.models import Exam, ExamAnswer, ExamResult, Question, QuestionOption
+from exams_management.proctor import board
+from exams_management.review import finalize_attempt
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class ProctorBoardTestCase(TestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name='Proctor Subject')
+        grade = Grade.objects.create(name='Proctor Grade')
+        self.exam = Exam.objects.create(title='Proctor', subject=subject, grade_level=grade, paper_type='test',
+                                        duration=timedelta(minutes=30), student_question_limit=3)
+        self.addCleanup(board.forget, self.exam.id)
+        self.options = []
+        for i in range(3):
+            question = Question.objects.create(question_text=f'Proctor {i}', question_type='multiple_choice')
+            self.options.append(QuestionOption.objects.create(question=question, option_text='a', is_correct=True))
+        self.attempts = []
+        for i in range(2):
+            student = User.objects.create_user(email=f'sitter{i}@example.com', password='password', role='student',
+                                               first_name='Sitter', last_name=str(i))
+            self.attempts.append(ExamResult.objects.create(
+                exam=self.exam, student=student, start_time=timezone.now(),
+                question_ids=[option.question_id for option in self.options],
+            ))
+        ExamAnswer.objects.create(attempt=self.attempts[0], question_id=self.options[0].question_id,
+                                  selected_option=self.options[0])
+
+    def rows(self):
+        return {row['attempt']: row for row in board.snapshot(self.exam.id)}
+
+    def test_board_loads_once_then_follows_autosaves_without_queries(self):
+        with self.assertNumQueries(2):
+            board.watch(self.exam)
+        self.assertEqual(self.rows()[self.attempts[0].id]['answered'], 1)
+        self.assertEqual(self.rows()[self.attempts[1].id]['student'], 'Sitter 1')
+
+        apply_answers(self.attempts[0], {self.options[1].question_id: self.options[1].id}, seq=1)
+        with self.assertNumQueries(0):
+            rows = self.rows()
+            board.watch(self.exam)
+        self.assertEqual(rows[self.attempts[0].id]['answered'], 2)
+
+    def test_going_quiet_counts_a_disconnect(self):
+        board.watch(self.exam)
+        attempt = self.attempts[1]
+        now = timezone.now()
+        board.seen(attempt.id, now)
+        board.seen(attempt.id, now + timedelta(seconds=20))
+        self.assertEqual(self.rows()[attempt.id]['disconnects'], 0)
+        board.seen(attempt.id, now + timedelta(minutes=5))
+        board.streaming(attempt.id, True)
+        board.streaming(attempt.id, False)
+        self.assertEqual(self.rows()[attempt.id]['disconnects'], 2)
+
+    def test_only_changes_are_pushed_and_finished_attempts_leave(self):
+        board.watch(self.exam)
+        board.publish()
+        received = []
+        channel = proctor.channel(self.exam.id)
+        events.bus.subscribe([channel], received.append)
+        self.addCleanup(events.bus.unsubscribe, [channel], received.append)
+
+        registry.beat(self.attempts[0].id)
+        finalize_attempt(self.attempts[1])
+        board.publish()
+        board.publish()  # nothing new
+        self.assertEqual(len(received), 1)
+        data = received[0][3]
+        self.assertEqual([row['attempt'] for row in data['attempts']], [self.attempts[0].id])
+        self.assertEqual(data['finished'], [self.attempts[1].id])
+        self.assertNotIn(self.attempts[1].id, self.rows())
+
+    def test_dashboard_is_for_staff(self):
+        student = self.attempts[0].student
+        self.client.force_login(student)
+        self.assertEqual(self.client.get(reverse('exam:proctor_state', args=[self.exam.id])).status_code, 403)
+
+        self.client.force_login(User.objects.create_user(email='invigilator@example.com', password='password',
+                                                         role='teacher'))
+        response = self.client.get(reverse('exam:proctor', args=[self.exam.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['board']['attempts']), 2)
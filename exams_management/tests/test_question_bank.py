@@ -0,0 +1,153 @@
+import io
+import json
+import os
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase
+from exams_management.models import Exam, ExamBoard, Question, QuestionOption
+from exams_management.facets import facet_counts
+from exams_management.question_bank import QuestionBankImporter, iter_questions
+from school_management.models import Grade, Subject
+
+
+def write_bank(directory, filename, questions):
+    with open(os.path.join(directory, filename), 'w', encoding='utf-8') as f:
+        json.dump({'total_questions': len(questions), 'questions': questions}, f)
+
+
+class QuestionBankImporterTestCase(TestCase):
+    def setUp(self):
+        Grade.objects.get_or_create(name='SSS 3')
+        self.subject, _ = Subject.objects.get_or_create(name='Biology')
+        ExamBoard.objects.get_or_create(abbreviation='JAMB', defaults={'name': 'Joint Admissions and Matriculation Board'})
+        ExamBoard.objects.get_or_create(abbreviation='WAEC', defaults={'name': 'West African Examinations Council'})
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.questions = [
+            {
+                'question_text': f'<p>Question {i}</p>',
+                'options': {'A': 'one', 'B': 'two', 'C': 'three'},
+                'exam_year': 'JAMB\n                        1978',
+                'answer': 'b',
+            }
+            for i in range(7)
+        ]
+        self.questions.append({'question_text': '<p>Explain osmosis</p>', 'exam_year': '2001', 'answer': ''})
+        write_bank(self.tmp.name, 'Biology.json', self.questions)
+
+    def test_import_directory_batches(self):
+        importer = QuestionBankImporter(batch_size=3, log=lambda message: None)
+        stats = importer.import_directory(self.tmp.name)
+
+        self.assertEqual(stats.files, 1)
+        self.assertEqual(stats.questions, 8)
+        self.assertEqual(stats.options, 21)
+
+        exam = Exam.objects.get(title='Biology Past Questions')
+        self.assertEqual(exam.subject, self.subject)
+        self.assertEqual(exam.questions.count(), 8)
+
+        question = exam.questions.get(question_text='<p>Question 0</p>')
+        self.assertEqual(question.question_plain, 'Question 0')
+        self.assertEqual(question.exam_board.abbreviation, 'JAMB')
+        self.assertEqual(question.exam_year, 1978)
+        self.assertEqual(list(question.options.filter(is_correct=True).values_list('option_text', flat=True)), ['two'])
+
+        essay = Question.objects.get(question_text='<p>Explain osmosis</p>')
+        self.assertEqual(essay.question_type, 'essay')
+        self.assertEqual(essay.exam_board.abbreviation, 'WAEC')
+        self.assertFalse(QuestionOption.objects.filter(question=essay).exists())
+
+    def test_unknown_subject_is_skipped(self):
+        write_bank(self.tmp.name, 'Underwater Basket Weaving.json', self.questions)
+        importer = QuestionBankImporter(log=lambda message: None)
+        stats = importer.import_file(os.path.join(self.tmp.name, 'Underwater Basket Weaving.json'))
+        self.assertEqual(stats.questions, 0)
+        self.assertFalse(Exam.objects.filter(title__startswith='Underwater').exists())
+
+
+    def test_parallel_import_matches_sequential(self):
+        Subject.objects.get_or_create(name='Physics')
+        write_bank(self.tmp.name, 'Physics.json', self.questions[:5])
+        importer = QuestionBankImporter(batch_size=2, log=lambda message: None)
+        stats = importer.import_directory(self.tmp.name, workers=2)
+
+        self.assertEqual(stats.files, 2)
+        self.assertEqual(stats.questions, 13)
+        self.assertEqual(Exam.objects.get(title='Biology Past Questions').questions.count(), 8)
+        self.assertEqual(Exam.objects.get(title='Physics Past Questions').questions.count(), 5)
+        self.assertEqual(QuestionOption.objects.filter(is_correct=True).count(), 12)
+
+    def test_resync_only_touches_changed_questions(self):
+        importer = QuestionBankImporter(log=lambda message: None)
+        importer.import_directory(self.tmp.name)
+        exam = Exam.objects.get(title='Biology Past Questions')
+        kept = exam.questions.get(question_text='<p>Question 0</p>')
+
+        stats = QuestionBankImporter(log=lambda message: None).import_directory(self.tmp.name)
+        self.assertEqual((stats.files, stats.unchanged, stats.questions), (0, 1, 0))
+
+        self.questions[1]['answer'] = 'C'
+        self.questions.append({'question_text': '<p>New for next year</p>', 'options': {'A': 'x'},
+                               'exam_year': 'WAEC 2025', 'answer': 'A'})
+        write_bank(self.tmp.name, 'Biology.json', self.questions)
+        stats = QuestionBankImporter(log=lambda message: None).import_directory(self.tmp.name)
+
+        self.assertEqual((stats.files, stats.questions, stats.retired), (1, 2, 1))
+        self.assertEqual(Exam.objects.filter(title='Biology Past Questions').count(), 1)
+        self.assertEqual(exam.questions.count(), 9)
+        self.assertTrue(exam.questions.filter(pk=kept.pk).exists())
+        changed = exam.questions.get(question_text='<p>Question 1</p>')
+        self.assertEqual(changed.options.get(is_correct=True).option_text, 'three')
+
+
+    def test_facet_counts_follow_imports(self):
+        QuestionBankImporter(log=lambda message: None).import_directory(self.tmp.name)
+        jamb = ExamBoard.objects.get(abbreviation='JAMB')
+
+        boards = facet_counts(subject=self.subject.id)
+        self.assertEqual(boards['level'], 'exam_board')
+        self.assertEqual(boards['total'], 8)
+        self.assertEqual({row['label']: row['count'] for row in boards['facets']}, {'JAMB': 7, 'WAEC': 1})
+
+        years = facet_counts(subject=self.subject.id, exam_board=jamb.id)
+        self.assertEqual(years['facets'], [{'value': 1978, 'label': 1978, 'count': 7}])
+
+        del self.questions[0]
+        write_bank(self.tmp.name, 'Biology.json', self.questions)
+        QuestionBankImporter(log=lambda message: None).import_directory(self.tmp.name)
+        self.assertEqual(facet_counts(subject=self.subject.id, exam_board=jamb.id, exam_year=1978)['total'], 6)
+
+
+class IterQuestionsTestCase(TestCase):
+    def test_streams_records_across_chunk_boundaries(self):
+        questions = [{'question_text': f'<p>Q{i} → café</p>', 'answer': 'A', 'marks': 10 ** i} for i in range(50)]
+        with tempfile.TemporaryDirectory() as tmp:
+            write_bank(tmp, 'Physics.json', questions)
+            path = os.path.join(tmp, 'Physics.json')
+            self.assertEqual(list(iter_questions(path, chunk_size=7)), questions)
+
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'questions': [], 'total_questions': 0}, f)
+            self.assertEqual(list(iter_questions(path)), [])
+
+
+
+class InstallSeedTestCase(TestCase):
+    def test_seed_is_copied_only_onto_a_fresh_install(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        seed = os.path.join(tmp.name, 'seed.sqlite3')
+        database = os.path.join(tmp.name, 'data', 'db.sqlite3')
+        with open(seed, 'wb') as f:
+            f.write(b'seeded')
+
+        call_command('install_question_bank_seed', seed=seed, database=database, stdout=io.StringIO())
+        with open(database, 'rb') as f:
+            self.assertEqual(f.read(), b'seeded')
+
+        with open(seed, 'wb') as f:
+            f.write(b'newer')
+        call_command('install_question_bank_seed', seed=seed, database=database, stdout=io.StringIO())
+        with open(database, 'rb') as f:
+            self.assertEqual(f.read(), b'seeded')
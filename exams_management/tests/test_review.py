@@ -0,0 +1,62 @@
+import json
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from exams_management.models import Exam, ExamResult, Question, QuestionOption
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class ReviewRecordTestCase(TestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name='Review Subject')
+        grade = Grade.objects.create(name='Review Grade')
+        self.exam = Exam.objects.create(title='Review', subject=subject, grade_level=grade, paper_type='test',
+                                        duration=timezone.timedelta(minutes=30), student_question_limit=2,
+                                        total_marks=10)
+        self.student = User.objects.create_user(email='reviewer@example.com', password='password', role='student')
+        self.client.force_login(self.student)
+        self.attempt = ExamResult.objects.create(exam=self.exam, student=self.student, start_time=timezone.now())
+        self.options = {}
+        for name in ('first', 'second'):
+            question = Question.objects.create(question_text=f'<p>{name} review question</p>',
+                                               question_type='multiple_choice', marks=2)
+            self.options[name] = (
+                QuestionOption.objects.create(question=question, option_text='yes', is_correct=True),
+                QuestionOption.objects.create(question=question, option_text='no'),
+            )
+            self.exam.questions.add(question)
+            self.attempt.question_ids.append(question.id)
+        self.attempt.save()
+
+    def test_submission_freezes_review(self):
+        right, _ = self.options['first']
+        _, wrong = self.options['second']
+        response = self.client.post(
+            reverse('exam:submit_exam', args=[self.attempt.id]),
+            json.dumps({'answers': {str(right.question_id): str(right.id), str(wrong.question_id): str(wrong.id)}}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.json()['status'], 'success')
+        self.attempt.refresh_from_db()
+        review = self.attempt.review
+        self.assertEqual((review['total_questions'], review['correct_answers']), (2, 1))
+        first, second = review['questions']
+        self.assertEqual((first['selected'], first['correct'], first['awarded']), (right.id, True, 2))
+        self.assertEqual((second['selected'], second['correct'], second['awarded']), (wrong.id, False, 0))
+
+        # Later edits to the bank do not rewrite history.
+        QuestionOption.objects.filter(id=wrong.id).update(is_correct=True)
+        with self.assertNumQueries(2):  # user, attempt
+            response = self.client.get(reverse('exam:exam_results', args=[self.attempt.id]))
+        self.assertContains(response, '(Your Answer)')
+        self.assertContains(response, 'first review question')
+
+    def test_results_backfills_older_attempts(self):
+        ExamResult.objects.filter(id=self.attempt.id).update(submitted_at=timezone.now(), score=0)
+        response = self.client.get(reverse('exam:exam_results', args=[self.attempt.id]))
+        self.assertEqual(response.status_code, 200)
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.review['total_questions'], 2)
@@ -0,0 +1,113 @@
+import random
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.forms import inlineformset_factory
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from exams_management.admin import BlueprintRuleFormSet
+from exams_management.models import Exam, ExamBlueprintRule, ExamBoard, ExamResult, Question, QuestionOption
+from exams_management.sampling import question_pool, sample_distinct, sample_question_ids, select_by_blueprint
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class SampleDistinctTestCase(SimpleTestCase):
+    def test_takes_one_per_cluster(self):
+        pool = [(i, cluster) for i, cluster in enumerate([7, 7, 7, None, 9, 9])]
+        picked = sample_distinct(pool, 3, rng=random.Random(1))
+        self.assertEqual(len(picked), 3)
+        self.assertEqual(sorted(dict(pool)[pk] or 0 for pk in picked), [0, 7, 9])
+        self.assertIsNone(sample_distinct(pool, 4))
+
+
+class QuestionPoolTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        subject = Subject.objects.create(name='Sampling Subject')
+        grade = Grade.objects.create(name='Sampling Grade')
+        self.exam = Exam.objects.create(title='Sampling', subject=subject, grade_level=grade, paper_type='test',
+                                        duration=timezone.timedelta(minutes=30), student_question_limit=3)
+        self.questions = [Question.objects.create(question_text=f'Q{i}', question_type='multiple_choice')
+                          for i in range(6)]
+        for question in self.questions:
+            QuestionOption.objects.create(question=question, option_text='A', is_correct=True)
+        self.exam.questions.add(*self.questions)
+
+    def test_pool_is_cached_per_version(self):
+        question_pool(self.exam)
+        with self.assertNumQueries(0):
+            ids = sample_question_ids(self.exam, 3)
+        self.assertEqual(len(set(ids)), 3)
+
+        extra = Question.objects.create(question_text='Q6', question_type='essay')
+        self.exam.questions.add(extra)
+        self.exam.pool_version += 1
+        self.exam.save()
+        self.assertIn(extra.id, dict(question_pool(self.exam)))
+        self.assertIsNone(sample_question_ids(self.exam, 8))
+
+    def test_take_exam_attaches_sampled_ids(self):
+        student = User.objects.create_user(email='sampler@example.com', password='password', role='student')
+        self.client.force_login(student)
+        url = reverse('exam:take_exam', args=[self.exam.id])
+        self.client.get(url)
+        attempt = ExamResult.objects.get(exam=self.exam, student=student)
+        self.assertEqual(len(attempt.question_ids), 3)
+
+
+class BlueprintTestCase(TestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name='Blueprint Subject')
+        grade = Grade.objects.create(name='Blueprint Grade')
+        self.board = ExamBoard.objects.create(name='Blueprint Board', abbreviation='BPB')
+        self.exam = Exam.objects.create(title='Blueprint', subject=subject, grade_level=grade, paper_type='test')
+        questions = []
+        for year in (2014, 2015, 2016, 2017):
+            for i in range(4):
+                questions.append(Question(question_text=f'{year}-{i}', question_type='multiple_choice',
+                                          exam_board=self.board, exam_year=year))
+        questions += [Question(question_text=f'essay {i}', question_type='essay', exam_year=2000 + i) for i in range(3)]
+        Question.objects.bulk_create(questions)
+        self.exam.questions.add(*Question.objects.filter(question_text__regex=r'^(20\d\d-\d|essay \d)$'))
+
+    def rule(self, **kwargs):
+        return ExamBlueprintRule.objects.create(exam=self.exam, **kwargs)
+
+    def test_quotas_and_year_cap(self):
+        rules = [
+            self.rule(count=4, exam_board=self.board, year_from=2015, year_to=2017, max_per_year=2),
+            self.rule(count=2, question_type='essay'),
+        ]
+        ids = select_by_blueprint(self.exam, rules, total=8)
+        self.assertEqual(len(set(ids)), 8)
+        chosen = Question.objects.filter(id__in=ids[:4])
+        years = [q.exam_year for q in chosen]
+        self.assertTrue(all(2015 <= year <= 2017 for year in years))
+        self.assertTrue(all(years.count(year) <= 2 for year in years))
+        self.assertEqual(set(Question.objects.filter(id__in=ids[4:6]).values_list('question_type', flat=True)), {'essay'})
+
+    def test_unsatisfiable_quota_returns_none(self):
+        rules = [self.rule(count=5, exam_board=self.board, year_from=2016, year_to=2016)]
+        self.assertIsNone(select_by_blueprint(self.exam, rules))
+
+    def test_strata_are_read_once_per_pool_version(self):
+        rules = [self.rule(count=3, exam_board=self.board), self.rule(count=1, question_type='essay')]
+        with self.assertNumQueries(3):  # two strata and the top-up
+            select_by_blueprint(self.exam, rules, total=6)
+        with self.assertNumQueries(0):
+            draws = {tuple(select_by_blueprint(self.exam, rules, total=6)) for _ in range(10)}
+        self.assertGreater(len(draws), 1)
+
+    def test_quotas_may_not_exceed_the_question_limit(self):
+        rules = [self.rule(count=4, exam_board=self.board), self.rule(count=2, question_type='essay')]
+        self.assertIsNone(select_by_blueprint(self.exam, rules, total=5))
+        self.exam.student_question_limit = 5
+        formset = inlineformset_factory(Exam, ExamBlueprintRule, formset=BlueprintRuleFormSet,
+                                        fields=['count'], extra=0)(
+            {'blueprint_rules-TOTAL_FORMS': '2', 'blueprint_rules-INITIAL_FORMS': '2',
+             'blueprint_rules-0-id': rules[0].id, 'blueprint_rules-0-count': '4',
+             'blueprint_rules-1-id': rules[1].id, 'blueprint_rules-1-count': '2'},
+            instance=self.exam)
+        self.assertFalse(formset.is_valid())
@@ -0,0 +1,51 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from exams_management import scoring
+from exams_management.models import Exam, ExamAnswer, ExamResult, Question, QuestionOption
+from exams_management.review import finalize_attempts
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class RescoreTestCase(TestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name='Scoring Subject')
+        grade = Grade.objects.create(name='Scoring Grade')
+        self.exam = Exam.objects.create(title='Scoring', subject=subject, grade_level=grade, paper_type='test',
+                                        duration=timedelta(minutes=30), student_question_limit=2, total_marks=10)
+        self.questions, self.right, self.wrong = [], [], []
+        for n in range(2):
+            question = Question.objects.create(question_text=f'Scoring question {n}', question_type='multiple_choice')
+            self.questions.append(question)
+            self.right.append(QuestionOption.objects.create(question=question, option_text='a', is_correct=True))
+            self.wrong.append(QuestionOption.objects.create(question=question, option_text='b'))
+
+        self.attempts = []
+        for n, picks in enumerate([(self.right[0], self.wrong[1]), (self.wrong[0], self.wrong[1])]):
+            student = User.objects.create_user(email=f'scorer{n}@example.com', password='password', role='student')
+            attempt = ExamResult.objects.create(exam=self.exam, student=student, start_time=timezone.now(),
+                                                question_ids=[question.id for question in self.questions])
+            for option in picks:
+                ExamAnswer.objects.create(attempt=attempt, question_id=option.question_id, selected_option=option)
+            self.attempts.append(attempt)
+        finalize_attempts(self.attempts)
+
+    def test_calculate_score_counts_correct_answers(self):
+        first, second = self.attempts
+        self.assertEqual((first.calculate_score(), second.calculate_score()), (5, 0))
+
+    def test_key_fix_rescores_served_attempts(self):
+        QuestionOption.objects.filter(id=self.wrong[1].id).update(is_correct=True)
+        QuestionOption.objects.filter(id=self.right[1].id).update(is_correct=False)
+        with self.assertNumQueries(7):  # served, attempts, counts, keys, savepoint + bulk update
+            self.assertEqual(scoring.rescore_question(self.questions[1].id), 2)
+
+        first, second = (ExamResult.objects.get(id=attempt.id) for attempt in self.attempts)
+        self.assertEqual((first.score, second.score), (10, 5))
+        self.assertEqual(first.review['correct_answers'], 2)
+        item = first.review['questions'][1]
+        self.assertEqual((item['correct'], item['awarded'] == item['marks']), (True, True))
+        self.assertEqual([option['is_correct'] for option in item['options']], [False, True])
@@ -0,0 +1,57 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from exams_management.models import Exam, ExamBoard, Question
+from exams_management.search import QuestionSearch
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class QuestionSearchTestCase(TestCase):
+    def setUp(self):
+        self.jamb, _ = ExamBoard.objects.get_or_create(abbreviation='JAMB', defaults={'name': 'JAMB'})
+        self.biology = Subject.objects.create(name='Search Biology')
+        self.physics = Subject.objects.create(name='Search Physics')
+        grade = Grade.objects.create(name='Search Grade')
+        self.bio_exam = Exam.objects.create(title='Bio', subject=self.biology, grade_level=grade, paper_type='practice')
+        self.phy_exam = Exam.objects.create(title='Phy', subject=self.physics, grade_level=grade, paper_type='practice')
+
+        self.photo = Question.objects.create(question_text='<p>Photosynthesis occurs in the chloroplast</p>',
+                                             question_type='essay', exam_board=self.jamb, exam_year=1990)
+        self.light = Question.objects.create(question_text='<p>Light travels in straight lines</p>',
+                                             question_type='essay', exam_year=2001)
+        self.bio_exam.questions.add(self.photo)
+        self.phy_exam.questions.add(self.light)
+
+    def test_prefix_match_and_filters(self):
+        self.assertEqual(list(QuestionSearch('photosynth')[0:10]), [self.photo])
+        self.assertEqual(QuestionSearch('photosynth', subject=self.physics.id).count(), 0)
+        self.assertEqual(QuestionSearch('the', exam_board=self.jamb.id, exam_year=1990).count(), 1)
+        self.assertEqual(QuestionSearch('"); DROP TABLE').count(), 0)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.light.question_text = '<p>Refraction bends light</p>'
+        self.light.save()
+        self.assertEqual(QuestionSearch('straight').count(), 0)
+        self.assertEqual(list(QuestionSearch('refraction')[0:10]), [self.light])
+
+        self.light.delete()
+        self.assertEqual(QuestionSearch('refraction').count(), 0)
+
+    def test_view_paginates(self):
+        user = User.objects.create_user(email='teacher@example.com', password='password', role='teacher')
+        self.client.force_login(user)
+        response = self.client.get(reverse('exam:question_search'), {'q': 'chloroplast'})
+        self.assertContains(response, 'Photosynthesis occurs')
+        self.assertContains(response, 'Page 1 of 1')
+
+    def test_view_ignores_filters_that_are_not_numbers(self):
+        user = User.objects.create_user(email='searcher@example.com', password='password', role='teacher')
+        self.client.force_login(user)
+        params = {'q': 'chloroplast', 'year': 'abc', 'board': '1x', 'subject': ''}
+        self.assertContains(self.client.get(reverse('exam:question_search'), params), 'Photosynthesis occurs')
+        with mock.patch('exams_management.search.fts_available', return_value=False):
+            self.assertContains(self.client.get(reverse('exam:question_search'), params), 'Photosynthesis occurs')
+        self.assertEqual(self.client.get(reverse('exam:question_facets'), {'year': 'abc'}).status_code, 200)
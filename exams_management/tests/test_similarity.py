@@ -0,0 +1,23 @@
+from django.test import SimpleTestCase
+from exams_management.similarity import find_clusters, signature, similarity
+
+
+class NearDuplicateTestCase(SimpleTestCase):
+    def test_reworded_questions_cluster(self):
+        signatures = {
+            1: signature('Which of the following mineral salts is a trace element?',
+                         ['Zinc', 'Carbon', 'Hydrogen', 'Potassium']),
+            2: signature('Which of the following mineral salts is a trace element',
+                         ['Potassium', 'CArbon', 'Hydrogen', 'Zinc']),
+            3: signature('Which of the following is not a form of mass movement?',
+                         ['landslide', 'earthquake', 'rockslide', 'talus creep']),
+        }
+        self.assertEqual(find_clusters(signatures), {1: 1, 2: 1})
+
+    def test_shared_stem_with_different_options_is_distinct(self):
+        stem = 'Choose the appropriate stress pattern from the options. The syllables are written in capital letters.'
+        a = signature(stem, ['sufFIciency', 'SUFFiciency', 'sufficienCY'])
+        b = signature(stem, ['exPOStulate', 'EXpostulate', 'expostuLATE'])
+        self.assertLess(similarity(a, b), 0.8)
+        self.assertEqual(find_clusters({1: a, 2: b}), {})
+
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from core.models import StudentProfile
+from exams_management.models import Exam, ExamResult, Question, QuestionOption
+from exams_management.sitting import SittingError, prepare_sitting
+from school_management.models import Grade, Subject
+
+User = get_user_model()
+
+
+class PrepareSittingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        subject = Subject.objects.create(name='Sitting Subject')
+        self.grade = Grade.objects.create(name='Sitting Grade')
+        self.exam = Exam.objects.create(title='Sitting', subject=subject, grade_level=self.grade, paper_type='test',
+                                        duration=timedelta(minutes=30), student_question_limit=3, is_active=True)
+        for i in range(5):
+            question = Question.objects.create(question_text=f'Sitting {i}', question_type='multiple_choice')
+            QuestionOption.objects.create(question=question, option_text='a', is_correct=True)
+            self.exam.questions.add(question)
+        self.students = []
+        for i in range(3):
+            student = User.objects.create_user(email=f'sitter{i}@example.com', password='password', role='student')
+            StudentProfile.objects.get_or_create(user=student, defaults={'grade_level': self.grade})
+            self.students.append(student)
+
+    def test_prepares_each_student_once(self):
+        self.assertEqual(prepare_sitting(self.exam), 3)
+        self.assertEqual(prepare_sitting(self.exam), 0)
+        attempts = ExamResult.objects.filter(exam=self.exam)
+        self.assertEqual(attempts.count(), 3)
+        self.assertFalse(attempts.exclude(start_time=None).exists())
+        for attempt in attempts:
+            self.assertEqual(len(attempt.question_ids), 3)
+
+    def test_opening_a_prepared_attempt_only_starts_the_clock(self):
+        prepare_sitting(self.exam)
+        attempt = ExamResult.objects.get(exam=self.exam, student=self.students[0])
+        drawn = attempt.question_ids
+        self.client.force_login(self.students[0])
+        response = self.client.get(reverse('exam:take_exam', args=[self.exam.id]))
+        self.assertEqual(response.status_code, 200)
+        attempt.refresh_from_db()
+        self.assertIsNotNone(attempt.start_time)
+        self.assertEqual(attempt.deadline, attempt.start_time + self.exam.duration)
+        self.assertEqual(attempt.question_ids, drawn)
+        self.assertEqual(ExamResult.objects.filter(exam=self.exam, student=self.students[0]).count(), 1)
+
+    def test_an_attempt_started_in_another_tab_keeps_its_clock(self):
+        prepare_sitting(self.exam)
+        attempt = ExamResult.objects.get(exam=self.exam, student=self.students[0])
+
+        def started_elsewhere(attempt):
+            start = timezone.now() - timedelta(minutes=10)
+            ExamResult.objects.filter(id=attempt.id).update(start_time=start, deadline=start + self.exam.duration)
+            attempt.refresh_from_db(fields=['start_time', 'deadline'])
+            return False
+
+        self.client.force_login(self.students[0])
+        with mock.patch('exams_management.views.start_attempt', started_elsewhere):
+            response = self.client.get(reverse('exam:take_exam', args=[self.exam.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(response.context['remaining_time'], 20 * 60, delta=5)
+        self.assertEqual(response.context['attempt_id'], attempt.id)
+
+    def test_too_small_a_paper_is_refused(self):
+        self.exam.student_question_limit = 6
+        self.exam.save()
+        with self.assertRaises(SittingError):
+            prepare_sitting(self.exam)
+
+    def test_a_failure_part_way_leaves_no_attempts(self):
+        draws = iter([[1, 2, 3], None])
+        with mock.patch('exams_management.sitting.BATCH_SIZE', 1), \
+                mock.patch('exams_management.sitting.draw_question_ids', lambda exam, rules: next(draws)):
+            with self.assertRaises(SittingError):
+                prepare_sitting(self.exam)
+        self.assertFalse(ExamResult.objects.filter(exam=self.exam).exists())
@@ -0,0 +1,31 @@
+from django.test import TestCase
+from exams_management.models import Question
+from exams_management.text import render_question_text
+
+
+class RenderQuestionTextTestCase(TestCase):
+    def test_strips_unsafe_markup(self):
+        html, plain = render_question_text(
+            '<p onclick="steal()">Given H\\(_2\\)O &amp; CO<sub>2</sub><br/>'
+            '<script>alert(1)</script><a href="javascript:alert(1)">more</a><img src="/media/q.png" onerror="x"></p>'
+        )
+        self.assertEqual(
+            html,
+            '<p>Given H\\(_2\\)O &amp; CO<sub>2</sub><br><a>more</a><img src="/media/q.png"></p>'
+        )
+        self.assertEqual(plain, 'Given H\\(_2\\)O & CO2 more')
+
+    def test_unclosed_tags_are_balanced(self):
+        html, plain = render_question_text('<p><b>Bold<i>both</p>tail')
+        self.assertEqual(html, '<p><b>Bold<i>both</i></b></p>tail')
+        self.assertEqual(plain, 'Boldboth tail')
+
+    def test_question_save_fills_columns(self):
+        question = Question.objects.create(question_text='<p>The <em>cell</em> is</p>', question_type='essay')
+        self.assertEqual(question.question_html, '<p>The <em>cell</em> is</p>')
+        self.assertEqual(question.question_plain, 'The cell is')
+
+        question.question_text = '<div>Changed</div>'
+        question.save(update_fields=['question_text'])
+        question.refresh_from_db()
+        self.assertEqual(question.question_plain, 'Changed')
@@ -0,0 +1,97 @@
+# exams_management/text.py
+from html import escape
+from html.parser import HTMLParser
+
+ALLOWED_TAGS = {
+    'p', 'br', 'b', 'strong', 'i', 'em', 'u', 's', 'sub', 'sup', 'span', 'div', 'blockquote', 'pre', 'code',
+    'ul', 'ol', 'li', 'table', 'thead', 'tbody', 'tr', 'th', 'td', 'img', 'a', 'hr', 'h1', 'h2', 'h3', 'h4',
+}
+VOID_TAGS = {'br', 'img', 'hr'}
+BLOCK_TAGS = {'p', 'br', 'div', 'li', 'tr', 'td', 'th', 'blockquote', 'pre', 'hr', 'h1', 'h2', 'h3', 'h4'}
+DROP_CONTENT_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'template'}
+ALLOWED_ATTRS = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+URL_ATTRS = {'href', 'src'}
+SAFE_SCHEMES = ('http://', 'https://', '/', 'data:image/')
+
+
+def _safe_url(value):
+    value = value.strip()
+    if ':' not in value.split('/', 1)[0]:
+        return True  # relative URL
+    return value.lower().startswith(SAFE_SCHEMES)
+
+
+class _QuestionTextParser(HTMLParser):
+    """Single pass that emits allow-listed HTML and the plain text together."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open_tags = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        if tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRS.get(tag, ())
+        rendered = ''.join(
+            f' {name}="{escape(value or "", quote=True)}"'
+            for name, value in attrs
+            if name in allowed and (name not in URL_ATTRS or _safe_url(value or ''))
+        )
+        self.html.append(f'<{tag}{rendered}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        if tag not in self.open_tags:
+            return
+        # Close anything left open inside this element so the output nests.
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def result(self):
+        self.close()
+        while self.open_tags:
+            self.html.append(f'</{self.open_tags.pop()}>')
+        return ''.join(self.html), ' '.join(''.join(self.text).split())
+
+
+def render_question_text(raw):
+    """
+    Return ``(sanitized_html, plain_text)`` for an imported or authored
+    question body. Scripts, styles, event handlers and unsafe URLs are
+    dropped; the plain text has markup removed and whitespace collapsed.
+    """
+    parser = _QuestionTextParser()
+    parser.feed(raw or '')
+    return parser.result()
@@ -11,6 +11,10 @@ urlpatterns = [
     path('exam_list/', exam_list, name='exam_list'),
     path('toggle-exam-active/<int:exam_id>/',toggle_exam_active, name='toggle_exam_active'),
     path('toggle-exam-shuffle/<int:exam_id>/', toggle_exam_shuffle, name='toggle_exam_shuffle'),
+    path('extend/<int:exam_id>/', extend_exam, name='extend_exam'),
+    path('proctor/<int:exam_id>/', proctor, name='proctor'),
+    path('proctor/<int:exam_id>/state/', proctor_state, name='proctor_state'),
+    path('toggle-exam-dedupe/<int:exam_id>/', toggle_exam_dedupe, name='toggle_exam_dedupe'),
     
     path('question_info/<int:exam_id>/', question_info, name='question_info'),
     path('update_student_question_limit/<int:exam_id>/', update_student_question_limit, name='update_student_question_limit'),
@@ -18,11 +22,16 @@ urlpatterns = [
     path('delete/<int:exam_id>/', delete, name='delete'),
     
     path('search/', exam_list, name='exam_search'),
+    path('questions/search/', question_search, name='question_search'),
+    path('questions/facets/', question_facets, name='question_facets'),
 
     path('take/<int:exam_id>/', take_exam, name='take_exam'),
     path('submit/<int:attempt_id>/', submit_exam, name='submit_exam'),
+    path('sync/<int:attempt_id>/', sync_answers, name='sync_answers'),
+    path('sw.js', service_worker, name='service_worker'),
     path('results/<int:attempt_id>/', exam_results, name='exam_results'),
     path('ping/<int:attempt_id>/', ping, name='ping'),
+    path('events/', event_stream, name='event_stream'),
     path('active_papers/', active_papers, name='active_papers'),
     path('ready/<int:exam_id>/', exam_ready, name='ready'),
     path('results/', results, name='results'),
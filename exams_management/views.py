@@ -1,7 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from .forms import SaveExam, CreateFolder
 from django.views.decorators.http import require_POST
-from .models import Question, Folder, QuestionOption, Exam, Subject, Grade, ExamAnswer, ExamResult
+from .models import Question, Folder, QuestionOption, Exam, Subject, Grade, ExamResult
 from core.models import StudentProfile
 import json
 from django.template.loader import render_to_string
@@ -14,8 +14,16 @@ from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.core.paginator import Paginator
-from django.db.models import Case, When, IntegerField, Q
-from random import sample
+from django.db.models import Case, When, IntegerField, F, Q
+from .search import QuestionSearch
+from .paper import attempt_questions, forget_paper, get_paper
+from .review import build_reviews, finalize_attempt
+from .answers import AnswerError, apply_answers, sync_batches
+from . import events, heartbeat, journal, sse
+from .proctor import PUBLISH_INTERVAL, board as proctor_board, channel as proctor_channel
+from .sampling import bump_pools_serving, question_pool
+from .sitting import draw_question_ids, start_attempt
+from . import facets
 
 def create(request):
     return render(request, 'format_exam.html', {
@@ -53,10 +61,45 @@ def exam_list(request):
     }
     return render(request, 'partials/exam_list.html', context)
 
+def int_param(request, name):
+    """The query-string value ``name`` as an int, or None when missing or not a number."""
+    try:
+        return int(request.GET.get(name))
+    except (TypeError, ValueError):
+        return None
+
+@login_required
+def question_search(request):
+    search_query = request.GET.get('q', '').strip()
+    filters = {
+        'subject': int_param(request, 'subject'),
+        'exam_board': int_param(request, 'board'),
+        'exam_year': int_param(request, 'year'),
+    }
+    paginator = Paginator(QuestionSearch(search_query, **filters), 20)
+    questions = paginator.get_page(request.GET.get('page'))
+
+    return render(request, 'partials/question_search_results.html', {
+        'questions': questions,
+        'search_query': search_query,
+        'filters': filters,
+    })
+
+@login_required
+def question_facets(request):
+    return JsonResponse(facets.facet_counts(
+        subject=int_param(request, 'subject'),
+        exam_board=int_param(request, 'board'),
+        exam_year=int_param(request, 'year'),
+        question_type=request.GET.get('type'),
+    ))
+
 def save_exam(request, exam_id=None):
     exam = None
+    previous_subject_id = None
     if exam_id:
         exam = get_object_or_404(Exam, id=exam_id)
+        previous_subject_id = exam.subject_id
 
     if request.method == "POST":
         form = SaveExam(request.POST, instance=exam)
@@ -68,6 +111,8 @@ def save_exam(request, exam_id=None):
                     questions_data = json.loads(request.POST.get('exam_questions', '[]'))
 
                     if exam_id:
+                        facets.record_questions(previous_subject_id, exam.questions.all(), sign=-1)
+                        bump_pools_serving(exam.questions.values_list('id', flat=True))
                         exam.questions.all().delete()
 
                     question_objects = []
@@ -89,6 +134,8 @@ def save_exam(request, exam_id=None):
                         question_objects.append(question)
 
                     exam.questions.add(*question_objects)
+                    facets.record_questions(exam.subject_id, question_objects)
+                    exam.pool_version += 1
                     exam.save()
 
                     # return JsonResponse({"message": "Exam saved successfully!", "exam_id": exam.id})
@@ -119,6 +166,8 @@ def save_question(request, exam_id):
                 )
 
         exam.questions.add(question)
+        facets.record_questions(exam.subject_id, [question])
+        exam.pool_version += 1
         exam.save()
 
         return JsonResponse({"message": "Question added successfully!"})
@@ -130,6 +179,12 @@ def toggle_exam_active(request, exam_id):
     exam = get_object_or_404(Exam, id=exam_id)
     exam.is_active = not exam.is_active
     exam.save()
+    if exam.is_active:
+        get_paper(exam)  # build the snapshot before students arrive
+    else:
+        forget_paper(exam.id)
+        proctor_board.forget(exam.id)
+    events.exam_changed(exam, 'live' if exam.is_active else 'closed')
     
     # Render the updated toggle HTML
     html = render_to_string('partials/toggle.html', {
@@ -141,6 +196,27 @@ def toggle_exam_active(request, exam_id):
     })
     return HttpResponse(html)
 
+@login_required
+@require_POST
+def extend_exam(request, exam_id):
+    """Give every attempt still running more time, and tell their timers at once."""
+    if request.user.role not in ('admin', 'teacher'):
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    exam = get_object_or_404(Exam, id=exam_id)
+    try:
+        minutes = int(request.POST.get('minutes', 0))
+    except ValueError:
+        minutes = 0
+    if minutes <= 0:
+        return JsonResponse({'error': 'Enter a number of minutes.'}, status=400)
+    extra = timezone.timedelta(minutes=minutes)
+    extended = ExamResult.objects.filter(exam=exam, submitted_at__isnull=True, deadline__isnull=False).update(
+        deadline=F('deadline') + extra,
+    )
+    proctor_board.extended(exam.id, extra)
+    events.exam_changed(exam, 'extended', seconds=int(extra.total_seconds()))
+    return JsonResponse({'message': f"Extended {extended} running attempts by {minutes} minutes."})
+
 @require_POST
 def toggle_exam_shuffle(request, exam_id):
     exam = get_object_or_404(Exam, id=exam_id)
@@ -155,6 +231,20 @@ def toggle_exam_shuffle(request, exam_id):
     })
     return HttpResponse(html)
 
+@require_POST
+def toggle_exam_dedupe(request, exam_id):
+    exam = get_object_or_404(Exam, id=exam_id)
+    exam.dedupe_questions = not exam.dedupe_questions
+    exam.save()
+
+    html = render_to_string('partials/toggle.html', {
+        'field': 'is_dedupe',
+        'checker': exam.dedupe_questions,
+        'label': 'Skip Near-Duplicates',
+        'deurl': '{% url "exam:toggle_exam_dedupe" exam.id %}',
+    })
+    return HttpResponse(html)
+
 def question_info(request, exam_id):
     exam = get_object_or_404(Exam, id=exam_id)
     context = {
@@ -189,6 +279,7 @@ def update_student_question_limit(request, exam_id):
 def delete(request, exam_id):
     if request.method == "DELETE":
         exam = get_object_or_404(Exam, id=exam_id)
+        facets.record_exam_questions(exam, sign=-1)
         exam.delete()
         return redirect('exam:exam_list')
 
@@ -201,6 +292,37 @@ def edit(request, exam_id):
         'editing': True if exam else False
     })
 
+def exam_events_url(request, attempt):
+    return sse.stream_url(request, events.make_token(request.user, attempt_id=attempt.id, exam_id=attempt.exam_id))
+
+@login_required
+def event_stream(request):
+    """Where the dashboards open their EventSource; ``url`` is null without the sidecar."""
+    return JsonResponse({'url': sse.stream_url(request, events.make_token(request.user))})
+
+@login_required
+def proctor(request, exam_id):
+    """Live board of the exam's running attempts, fed from memory and pushed every few seconds."""
+    if request.user.role not in ('admin', 'teacher'):
+        messages.error(request, "Only staff can proctor an exam.")
+        return redirect('dashboard')
+    exam = get_object_or_404(Exam.objects.select_related('subject'), id=exam_id)
+    token = events.make_token(request.user, extra=[proctor_channel(exam.id)])
+    return render(request, 'proctor.html', {
+        'exam': exam,
+        'board': {'attempts': proctor_board.watch(exam), 'now': int(timezone.now().timestamp() * 1000)},
+        'events_url': sse.stream_url(request, token),
+        'poll_interval': PUBLISH_INTERVAL * 1000,
+    })
+
+@login_required
+def proctor_state(request, exam_id):
+    """The whole board as JSON, for when the event stream is not running."""
+    if request.user.role not in ('admin', 'teacher'):
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    exam = get_object_or_404(Exam, id=exam_id)
+    return JsonResponse({'attempts': proctor_board.watch(exam), 'now': int(timezone.now().timestamp() * 1000)})
+
 @login_required
 @ensure_csrf_cookie
 def take_exam(request, exam_id):
@@ -209,16 +331,15 @@ def take_exam(request, exam_id):
     
     attempt = ExamResult.objects.filter(exam=exam, student=student).first()
     
-    if attempt:
+    if attempt and attempt.start_time:
         if attempt.submitted_at:
             messages.error(request, "You have already completed this exam. Only one attempt is allowed.")
             return redirect('dashboard')
         
         # Check if time has expired
         if attempt.has_expired():
-            attempt.score = attempt.calculate_score()
-            attempt.submitted_at = timezone.now()
-            attempt.save()
+            finalize_attempt(attempt)
+            heartbeat.forget_attempt(request.session, attempt.id)
             messages.error(request, "Your exam time has expired.")
             return redirect('exam:exam_results', attempt_id=attempt.id)
         
@@ -229,15 +350,31 @@ def take_exam(request, exam_id):
             return redirect('dashboard')
 
         remaining_seconds = max(0, exam.duration.total_seconds() - elapsed.total_seconds())
+        if attempt.deadline:
+            # Honors any extension granted while the attempt was running.
+            remaining_seconds = max(0, (attempt.deadline - timezone.now()).total_seconds())
+        heartbeat.remember_attempt(request.session, attempt.id)
+        journaled, journaled_seq = journal.overlay(attempt.id)
+        saved_answers = {
+            str(question_id): option_id
+            for question_id, option_id in attempt.answers.values_list('question_id', 'selected_option_id')
+        }
+        saved_answers.update((str(question_id), option_id) for question_id, option_id in journaled.items())
         
-        return render(request, 'take_exam.html', {
+        response = render(request, 'take_exam.html', {
             'exam': exam,
             'attempt_id': attempt.id,
-            'selected_questions':attempt.questions.all(),
+            'selected_questions': attempt_questions(exam, attempt.id, attempt.question_ids),
+            'saved_answers': saved_answers,
+            'autosave_seq': max(attempt.autosave_seq, journaled_seq),
             'remaining_time': int(remaining_seconds),
             'duration': exam.duration.total_seconds(),
-            'start_time': attempt.start_time.isoformat()  # Pass server-side start time
+            'start_time': attempt.start_time.isoformat(),  # Pass server-side start time
+            'events_url': exam_events_url(request, attempt),
+            'deadline_ms': int(attempt.deadline.timestamp() * 1000) if attempt.deadline else None,
         })
+        response['X-Exam-Attempt'] = attempt.id  # the service worker caches the paper per attempt
+        return response
     
     # Check exam availability
     current_time = timezone.now()
@@ -248,31 +385,76 @@ def take_exam(request, exam_id):
         messages.error(request, "This exam is no longer available.")
         return redirect('dashboard')
     
-    num_questions = exam.student_question_limit
-    all_questions = list(exam.questions.all())
-    
-    if num_questions > len(all_questions):
-        messages.error(request, "Not enough questions in the paper.")
-        return redirect('dashboard')
+    if attempt:
+        # Prepared by prepare_sitting: the questions are drawn, only the clock starts now.
+        if start_attempt(attempt):
+            proctor_board.started(attempt, student)
+        question_ids = attempt.question_ids
+    else:
+        num_questions = exam.student_question_limit
+        rules = list(exam.blueprint_rules.all())
+        question_ids = draw_question_ids(exam, rules)
+        if question_ids is None:
+            if rules:
+                messages.error(request, "The paper cannot satisfy its blueprint.")
+            elif exam.dedupe_questions and num_questions <= len(question_pool(exam)):
+                messages.error(request, "Not enough distinct questions in the paper.")
+            else:
+                messages.error(request, "Not enough questions in the paper.")
+            return redirect('dashboard')
 
-    selected_questions = sample(all_questions, num_questions)
-    attempt = ExamResult.objects.create(
-        exam=exam,
-        student=student,
-        start_time=timezone.now(),
-        score=None
-    )
-    
-    attempt.questions.add(*selected_questions)
+        attempt = ExamResult.objects.create(
+            exam=exam,
+            student=student,
+            question_ids=question_ids,
+            start_time=timezone.now(),
+            score=None
+        )
+        proctor_board.started(attempt, student)
+
+    heartbeat.remember_attempt(request.session, attempt.id)
+    # Another tab may have started a prepared attempt first; its clock is already running.
+    remaining_seconds = max(0, (attempt.deadline - timezone.now()).total_seconds()) if attempt.deadline \
+        else exam.duration.total_seconds()
 
-    return render(request, 'take_exam.html', {
+    response = render(request, 'take_exam.html', {
         'exam': exam,
-        'selected_questions':attempt.questions.all(),
+        'selected_questions': attempt_questions(exam, attempt.id, question_ids),
+        'saved_answers': {},
+        'autosave_seq': 0,
         'attempt_id': attempt.id,
-        'remaining_time': int(exam.duration.total_seconds()),
+        'remaining_time': int(remaining_seconds),
         'duration': exam.duration.total_seconds(),
-        'start_time': attempt.start_time.isoformat()
+        'start_time': attempt.start_time.isoformat(),
+        'events_url': exam_events_url(request, attempt),
+        'deadline_ms': int(attempt.deadline.timestamp() * 1000) if attempt.deadline else None,
     })
+    response['X-Exam-Attempt'] = attempt.id
+    return response
+
+@login_required
+@require_POST
+@transaction.atomic
+def sync_answers(request, attempt_id):
+    """Batched sync for the offline exam client: every queued batch in one request."""
+    attempt = ExamResult.objects.filter(id=attempt_id, student=request.user, start_time__isnull=False).first()
+    if attempt is None:
+        return JsonResponse({'status': 'error', 'message': 'Unknown attempt'}, status=404)
+    if attempt.submitted_at:
+        # Nothing left to sync into; the client drops its queue.
+        return JsonResponse({'status': 'submitted', 'redirect_url': f'/exam/results/{attempt_id}/'}, status=409)
+    try:
+        batches = json.loads(request.body).get('batches', [])
+        applied, seq = sync_batches(attempt, batches)
+    except (ValueError, AttributeError, AnswerError) as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    return JsonResponse({'status': 'synced' if applied else 'stale', 'seq': seq})
+
+def service_worker(request):
+    # Served from /exam/ so its scope covers the exam pages.
+    response = render(request, 'exam_sw.js', content_type='application/javascript')
+    response['Cache-Control'] = 'no-cache'
+    return response
 
 @login_required
 @transaction.atomic
@@ -280,10 +462,12 @@ def submit_exam(request, attempt_id):
     if request.method != 'POST':
         return JsonResponse({'status': 'error', 'message': 'Invalid request method'}, status=405)
     
-    attempt = get_object_or_404(ExamResult, 
-                              id=attempt_id, 
-                              student=request.user,
-                              submitted_at__isnull=True)
+    attempt = ExamResult.objects.filter(id=attempt_id, student=request.user, start_time__isnull=False).first()
+    if attempt is None:
+        return JsonResponse({'status': 'error', 'message': 'Unknown attempt'}, status=404)
+    if attempt.submitted_at:
+        # Submitted by the sweeper or another tab; same reply as sync_answers.
+        return JsonResponse({'status': 'submitted', 'redirect_url': f'/exam/results/{attempt_id}/'}, status=409)
     
     # Check if time has expired (skip for autosave to allow saving last minute work, or enforce? 
     # Usually autosave should still work, but final submission checks time. 
@@ -291,9 +475,8 @@ def submit_exam(request, attempt_id):
     is_autosave = request.GET.get('autosave') == 'true'
     
     if not is_autosave and attempt.has_expired():
-        attempt.score = attempt.calculate_score()
-        attempt.submitted_at = timezone.now()
-        attempt.save()
+        finalize_attempt(attempt)
+        heartbeat.forget_attempt(request.session, attempt.id)
         return JsonResponse({
             'status': 'timeout',
             'message': 'Time expired',
@@ -304,157 +487,52 @@ def submit_exam(request, attempt_id):
     try:
         data = json.loads(request.body)
         answers = data.get('answers', {})
-        
-        if not answers:
-             return JsonResponse({'status': 'success', 'message': 'No answers to save.'})
+        seq = data.get('seq')
+        if seq is not None:
+            seq = int(seq)
 
-        # 1. Security Fix: Validate that all submitted questions belong to this attempt
-        submitted_question_ids = set(str(k) for k in answers.keys())
-        allowed_question_ids = set(str(q.id) for q in attempt.questions.all())
-        
-        if not submitted_question_ids.issubset(allowed_question_ids):
-            return JsonResponse({'status': 'error', 'message': 'Invalid question submitted.'}, status=400)
+        if not is_autosave:
+            # Journaled autosaves first, so the final answers land on top.
+            journal.settle([attempt])
+        applied, seq = apply_answers(attempt, answers, seq, deferred=is_autosave)
 
-        # 2. Performance Fix: Bulk fetch and update
-        # Fetch all relevant questions and options in one go
-        questions_map = {str(q.id): q for q in attempt.questions.filter(id__in=submitted_question_ids)}
-        options_map = {str(o.id): o for o in QuestionOption.objects.filter(id__in=answers.values())}
-        
-        # Prepare ExamAnswer objects
-        existing_answers = {
-            str(a.question.id): a 
-            for a in ExamAnswer.objects.filter(attempt=attempt, question__id__in=submitted_question_ids)
-        }
-        
-        to_create = []
-        to_update = []
-        
-        for q_id, o_id in answers.items():
-            question = questions_map.get(str(q_id))
-            option = options_map.get(str(o_id))
-            
-            if not question or not option:
-                continue # Should be caught by security check, but safety net
-                
-            # Validate option belongs to question (Security/Data Integrity)
-            if option.question_id != question.id:
-                 return JsonResponse({'status': 'error', 'message': 'Invalid option for question.'}, status=400)
-
-            if str(q_id) in existing_answers:
-                answer_obj = existing_answers[str(q_id)]
-                if answer_obj.selected_option_id != option.id:
-                    answer_obj.selected_option = option
-                    to_update.append(answer_obj)
-            else:
-                to_create.append(ExamAnswer(
-                    attempt=attempt,
-                    question=question,
-                    selected_option=option
-                ))
-        
-        if to_create:
-            ExamAnswer.objects.bulk_create(to_create)
-        if to_update:
-            ExamAnswer.objects.bulk_update(to_update, ['selected_option'])
-        
         if not is_autosave:
-            attempt.score = attempt.calculate_score()
-            attempt.submitted_at = timezone.now()
-            attempt.save()
+            finalize_attempt(attempt, settle=False)
+            heartbeat.forget_attempt(request.session, attempt.id)
             
             return JsonResponse({
                 'status': 'success',
                 'score': attempt.score,
                 'redirect_url': f'/exam/results/{attempt_id}/'
             })
-        else:
-            # Update last activity
-            attempt.save() # Updates auto_now field
-            return JsonResponse({'status': 'autosaved'})
+        return JsonResponse({'status': 'autosaved' if applied else 'stale', 'seq': seq})
 
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
 
 @login_required
 def exam_results(request, attempt_id):
-    attempt = get_object_or_404(ExamResult, id=attempt_id, student=request.user)
+    attempt = get_object_or_404(ExamResult.objects.select_related('exam__subject'), id=attempt_id, student=request.user)
     
     if attempt.submitted_at is None:
         messages.error(request, "This exam has not been submitted yet.")
         return redirect('dashboard')
     
-    # Fetch all answers for this attempt
-    user_answers_map = {}
-    try:
-        answers = ExamAnswer.objects.filter(attempt=attempt).select_related('selected_option')
-        for answer in answers:
-            if answer.selected_option:
-                user_answers_map[answer.question_id] = answer.selected_option.id
-    except Exception as e:
-        messages.error(request, f"Error retrieving answers: {str(e)}")
-    
-    total_questions = attempt.questions.count()
-    correct_answers = 0
-    
-    # Prepare questions with context for the template
-    questions_with_context = []
-    correct_question_ids = {} # For navigator
-    
-    # Prefetch options to avoid N+1 in the loop
-    questions = attempt.questions.prefetch_related('options').all()
-    
-    for question in questions:
-        user_selected_id = user_answers_map.get(question.id)
-        question.user_selected_id = user_selected_id
-        
-        is_question_correct = False
-        
-        # Annotate options
-        # We need to iterate options to determine question correctness and style options
-        options = list(question.options.all()) # Evaluate queryset
-        for option in options:
-            option.is_selected = (option.id == user_selected_id)
-            
-            if option.is_selected and option.is_correct:
-                is_question_correct = True
-            
-            # Styling logic
-            if option.is_correct:
-                option.style_class = 'bg-green-100'
-                option.icon_class = 'bg-green-500 text-white'
-                option.status_text = '(Correct Answer)'
-                option.text_class = 'text-green-600'
-            elif option.is_selected and not option.is_correct:
-                option.style_class = 'bg-red-100'
-                option.icon_class = 'bg-red-500 text-white'
-                option.status_text = '(Your Answer)'
-                option.text_class = 'text-red-600'
-            else:
-                option.style_class = ''
-                option.icon_class = 'border border-gray-300'
-                option.status_text = ''
-                option.text_class = ''
-        
-        if is_question_correct:
-            correct_answers += 1
-            correct_question_ids[question.id] = True
-        else:
-            correct_question_ids[question.id] = False
-            
-        question.annotated_options = options
-        questions_with_context.append(question)
+    review = attempt.review
+    if review is None:
+        # Submitted before reviews were recorded; freeze it now.
+        review = attempt.review = build_reviews([attempt])[attempt.id]
+        attempt.save(update_fields=['review'])
 
     percentage = (attempt.score / attempt.exam.total_marks) * 100 if attempt.exam.total_marks > 0 else 0
     
     context = {
         'attempt': attempt,
-        'selected_questions': questions_with_context, # Use the annotated list
+        'selected_questions': review['questions'],
         'exam': attempt.exam,
-        'total_questions': total_questions,
-        'correct_answers': correct_answers,
+        'total_questions': review['total_questions'],
+        'correct_answers': review['correct_answers'],
         'percentage': percentage,
-        'user_answers': user_answers_map, # Kept for backward compat if needed, but mostly unused now
-        'correct_question_ids': correct_question_ids,
     }
     
     return render(request, 'exam_review.html', context)
@@ -483,7 +561,7 @@ def results(request):
             Q(exam__subject__name__icontains=search_query)
         )
 
-    results = results.order_by('-submitted_at')
+    results = results.exclude(start_time=None).select_related('exam__subject', 'student').defer('review').order_by('-submitted_at')
     paginator = Paginator(results, 15)
 
 
@@ -492,11 +570,15 @@ def results(request):
         
     return render(request, 'results.html', context={'results':results, 'result_search_query': search_query})
 
-@login_required
 @require_POST
 def ping(request, attempt_id):
-    attempt = get_object_or_404(ExamResult, id=attempt_id, student=request.user, submitted_at__isnull=True)
-    # last_activity is automatically updated due to auto_now=True
+    # No login_required and no ExamResult lookup: the session already lists
+    # the attempts this browser opened, so a heartbeat is a dict write.
+    if not heartbeat.owns_attempt(request.session, attempt_id):
+        return JsonResponse({'status': 'error', 'message': 'Unknown attempt'}, status=404)
+    if not heartbeat.registry.beat(attempt_id):
+        heartbeat.forget_attempt(request.session, attempt_id)
+        return JsonResponse({'status': 'finished'}, status=410)
     return JsonResponse({'status': 'ok'})
 
 def active_papers(request):
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -55,10 +56,30 @@ WSGI_APPLICATION = 'schoolmanager.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SCHOOLMANAGER_DB', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {
+            # WAL lets exam pages keep reading while the autosave flusher writes.
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            'timeout': 20,
+        },
     }
 }
 
+# Prebuilt snapshot of the past-question bank, copied in place of a fresh
+# database on first install (see build_question_bank_seed).
+QUESTION_BANK_SEED = BASE_DIR / 'seed' / 'question_bank.sqlite3'
+
+# Sessions are read from the local cache and written through to the
+# database, so exam heartbeats and autosaves do not query django_session.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Write-behind autosave log, drained by the background flusher (exams_management/journal.py).
+AUTOSAVE_JOURNAL_DIR = BASE_DIR / 'journal'
+
+# Port of the Server-Sent Events sidecar that scripts/run_service.py starts
+# next to Waitress (exams_management/sse.py).
+EXAM_EVENTS_PORT = int(os.environ.get('EXAM_EVENTS_PORT', 8001))
+
 AUTH_PASSWORD_VALIDATORS = [
     # {
     #     'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
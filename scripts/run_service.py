@@ -15,4 +15,7 @@ from schoolmanager.wsgi import application
 if __name__ == '__main__':
     # Run with Waitress WSGI server
     print("Starting Django application with Waitress...")
+    from exams_management import background, sse
+    background.start()
+    sse.start()
     serve(application, host='0.0.0.0', port=8000)
@@ -87,11 +87,25 @@ class DjangoServiceManager:
 
         return True
 
+    def install_seed_database(self):
+        """Copy the prebuilt question-bank database into place on a fresh install"""
+        # Django resolves both paths (QUESTION_BANK_SEED and the database NAME),
+        # so they are not duplicated here.
+        print("Installing prebuilt question bank database...")
+        result = subprocess.run([self.venv_path, 'manage.py', 'install_question_bank_seed'],
+                                cwd=str(self.project_dir), check=True, capture_output=True, text=True)
+        print(f"✅ {result.stdout.strip()}")
+        return True
+
     def run_migrations(self):
         """Run Django database migrations"""
         print("\n🗄️ Running database migrations...")
         
         try:
+            # A seeded database already has the bank imported and its
+            # migrations recorded, so migrate only applies newer ones.
+            self.install_seed_database()
+
             # First, make migrations in case there are new ones
             print("Creating migrations...")
             subprocess.run([self.venv_path, 'manage.py', 'makemigrations'], 
@@ -494,9 +508,6 @@ if __name__ == '__main__':
         print("The Django service has been completely removed.")
         return True
 
-    def pull_updates(self):
-        #edge cases 1. update without git  2. 
-
     def update(self):
         """Update the service with new code changes"""
         self.print_header("Update")
@@ -516,7 +527,6 @@ if __name__ == '__main__':
 
         # Update steps
         steps = [
-            ("Pulling updates", self.pull_updates)
             ("Installing/updating dependencies", self.install_requirements),
             ("Running database migrations", self.run_migrations),
             ("Collecting static files", self.collect_static),